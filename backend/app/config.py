@@ -23,11 +23,37 @@ class Settings(BaseSettings):
     # ── LLM / BYOK ────────────────────────────────────────────────────
     LLM_API_KEY: str | None = None
     LLM_MODEL: str = "gpt-4o-mini"  # Default model for litellm
+    # Estimated input-token budget per batch-translation prompt; batches
+    # are packed greedily under it so completions never truncate
+    MAX_BATCH_TOKENS: int = 800
+
+    # ── Detection ──────────────────────────────────────────────────────
+    # "auto" picks CUDA when available, else CPU; set "cpu"/"cuda" to force
+    DETECTOR_DEVICE: str = "auto"
+    # Inference precision: "fp32" (default), "fp16" (CUDA), "int8" (CPU)
+    DETECTOR_PRECISION: str = "fp32"
+
+    # ── Typesetting ────────────────────────────────────────────────────
+    # Render worker processes for export; None means one per CPU core
+    TYPESET_WORKERS: int | None = None
+    # Force an output format for rendered pages ("webp" roughly halves
+    # bytes at similar quality); None keeps each page's own extension
+    TYPESET_FORMAT: str | None = None
+
+    # ── Inpainting ─────────────────────────────────────────────────────
+    # Path to an exported LaMa ONNX model; when set (and onnxruntime is
+    # installed) inpainting runs through ONNX Runtime instead of IOPaint
+    LAMA_ONNX_PATH: Path | None = None
 
     # ── Server ─────────────────────────────────────────────────────────
     HOST: str = "127.0.0.1"
     PORT: int = 8000
     DEBUG: bool = True
+    # Origins allowed by CORS — the Vite dev server by default
+    CORS_ORIGINS: list[str] = [
+        "http://localhost:5173",
+        "http://127.0.0.1:5173",
+    ]
 
 
 # Singleton instance — import this everywhere
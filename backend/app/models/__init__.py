@@ -1,4 +1,5 @@
 from app.models.project import Project, Page, TextBlock
 from app.models.settings import Settings
+from app.models.translation_cache import TranslationCache
 
-__all__ = ["Project", "Page", "TextBlock", "Settings"]
+__all__ = ["Project", "Page", "TextBlock", "Settings", "TranslationCache"]
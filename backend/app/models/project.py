@@ -6,7 +6,7 @@ Hierarchy:  Project  →(1:N)→  Page  →(1:N)→  TextBlock
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -47,9 +47,15 @@ class Project(Base):
 # ── Page ───────────────────────────────────────────────────────────────
 class Page(Base):
     __tablename__ = "pages"
+    __table_args__ = (
+        # Covers the WHERE project_id ... ORDER BY page_number pattern
+        Index("ix_page_proj_num", "project_id", "page_number"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
-    project_id: Mapped[str] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    project_id: Mapped[str] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     page_number: Mapped[int] = mapped_column(Integer, default=0)
     image_path: Mapped[str] = mapped_column(String(500), nullable=False)  # Relative path on disk
@@ -71,7 +77,9 @@ class TextBlock(Base):
     __tablename__ = "text_blocks"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
-    page_id: Mapped[str] = mapped_column(ForeignKey("pages.id", ondelete="CASCADE"), nullable=False)
+    page_id: Mapped[str] = mapped_column(
+        ForeignKey("pages.id", ondelete="CASCADE"), nullable=False, index=True
+    )
 
     # Bounding box coordinates (top-left origin)
     box_x: Mapped[float] = mapped_column(Float, default=0.0)
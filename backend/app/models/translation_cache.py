@@ -0,0 +1,18 @@
+"""
+Kage Scan — Translation Cache Model
+Stores finished translations keyed by a hash of (source, target, text),
+so recurring SFX/interjections skip the LLM round trip entirely.
+"""
+
+from sqlalchemy import LargeBinary, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TranslationCache(Base):
+    __tablename__ = "translation_cache"
+
+    # BLAKE2b-128 digest of "source_lang|target_lang|text"
+    key: Mapped[bytes] = mapped_column(LargeBinary(16), primary_key=True)
+    translation: Mapped[str] = mapped_column(Text)
@@ -3,9 +3,13 @@ Kage Scan — Pipeline Router
 Orchestrates the Detect → OCR → Translate flow as a background task.
 """
 
+import asyncio
+import os.path
+import time
+
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -18,11 +22,21 @@ from app.config import settings
 
 router = APIRouter(prefix="/pipeline", tags=["Pipeline"])
 
+# Resolved once — avoids a Path allocation + str() per page in hot loops
+_DATA_DIR = os.fspath(settings.DATA_DIR)
+
 # ── Singleton service instances ───────────────────────────────────────
 detector = TextDetector()
 ocr_engine = OcrEngine()
 translator = Translator()
 
+# ── Status cache ──────────────────────────────────────────────────────
+# The UI polls /status every second during a run; a short TTL absorbs
+# that without hitting SQLite. Keyed by project_id only (never the db
+# session), invalidated whenever a page commits progress.
+_STATUS_CACHE: dict[str, tuple[float, dict]] = {}
+_STATUS_CACHE_TTL = 0.5  # seconds
+
 
 # ── Background Task ───────────────────────────────────────────────────
 async def process_project_task(project_id: str) -> None:
@@ -46,24 +60,47 @@ async def process_project_task(project_id: str) -> None:
 
             project.status = "processing"
             await db.commit()
+            _STATUS_CACHE.pop(project_id, None)
 
             logger.info(
                 f"🔄 Pipeline started for '{project.name}' "
                 f"({len(project.pages)} pages, {project.source_language}→{project.target_language})"
             )
 
-            # ── 2. Process each page ──────────────────────────────
-            for page in sorted(project.pages, key=lambda p: p.page_number):
-                await _process_page(
-                    db=db,
-                    page=page,
-                    source_lang=project.source_language,
-                    target_lang=project.target_language,
-                )
+            # ── 2. Process pages concurrently ─────────────────────
+            # Small bound: detection on one page overlaps OCR/translation
+            # on another. Each task gets its own AsyncSession — sessions
+            # are not safe to share across concurrent tasks.
+            page_sem = asyncio.Semaphore(3)
+            source_lang = project.source_language
+            target_lang = project.target_language
+
+            async def _run_page(page_id: str) -> None:
+                async with page_sem:
+                    async with async_session() as page_db:
+                        result = await page_db.execute(
+                            select(Page).where(Page.id == page_id)
+                        )
+                        await _process_page(
+                            db=page_db,
+                            page=result.scalar_one(),
+                            source_lang=source_lang,
+                            target_lang=target_lang,
+                        )
+
+            sorted_pages = sorted(project.pages, key=lambda p: p.page_number)
+            outcomes = await asyncio.gather(
+                *(_run_page(p.id) for p in sorted_pages),
+                return_exceptions=True,
+            )
+            for page, outcome in zip(sorted_pages, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"  Page {page.page_number} failed: {outcome}")
 
             # ── 3. Mark project as ready ──────────────────────────
             project.status = "ready"
             await db.commit()
+            _STATUS_CACHE.pop(project_id, None)
 
             logger.info(f"✅ Pipeline complete for '{project.name}'")
 
@@ -85,7 +122,7 @@ async def _process_page(
 ) -> None:
     """Process a single page: detect → OCR → translate all text blocks."""
 
-    image_full_path = str(settings.DATA_DIR / page.image_path)
+    image_full_path = os.path.join(_DATA_DIR, page.image_path)
     logger.info(f"  📄 Processing page {page.page_number}: {page.filename}")
 
     # Clear existing text blocks from previous runs
@@ -95,8 +132,10 @@ async def _process_page(
     for old_block in existing_blocks.scalars():
         await db.delete(old_block)
 
+    # Intermediate statuses are flushed, not committed — one WAL commit
+    # per page (at the end) instead of three fsync cycles
     page.status = "processing"
-    await db.commit()
+    await db.flush()
 
     # ── Step A: Text Detection ────────────────────────────────────
     try:
@@ -109,30 +148,32 @@ async def _process_page(
         logger.warning(f"  No text regions found in {page.filename}")
         page.status = "done"
         await db.commit()
+        _STATUS_CACHE.pop(page.project_id, None)
         return
 
     logger.info(f"  Found {len(bboxes)} text regions")
 
-    # ── Step B: OCR each region ───────────────────────────────────
-    ocr_results: list[tuple[dict, str]] = []
-    for bbox in bboxes:
-        text = await ocr_engine.extract_text(
-            image_path=image_full_path,
-            bbox=bbox,
-            source_lang=source_lang,
-        )
-        if text:  # Only keep blocks that yielded text
-            ocr_results.append((bbox, text))
+    # ── Step B: OCR all regions (batched where backend supports) ──
+    texts = await ocr_engine.extract_text_batch(
+        image_path=image_full_path,
+        bboxes=bboxes,
+        source_lang=source_lang,
+    )
+    # Only keep blocks that yielded text (order matches bboxes)
+    ocr_results: list[tuple[dict, str]] = [
+        (bbox, text) for bbox, text in zip(bboxes, texts) if text
+    ]
 
     if not ocr_results:
         logger.warning(f"  OCR returned no text for {page.filename}")
         page.status = "done"
         await db.commit()
+        _STATUS_CACHE.pop(page.project_id, None)
         return
 
     logger.info(f"  OCR extracted text from {len(ocr_results)} regions")
     page.status = "ocr_done"
-    await db.commit()
+    await db.flush()
 
     # ── Step C: Translate ─────────────────────────────────────────
     original_texts = [text for _, text in ocr_results]
@@ -152,21 +193,24 @@ async def _process_page(
             f.write(f"\n{'='*60}\n{err_msg}\n")
         translated_texts = [f"[ERRO] {t}" for t in original_texts]
 
-    # ── Step D: Save TextBlock records ────────────────────────────
-    for (bbox, original), translated in zip(ocr_results, translated_texts):
-        block = TextBlock(
-            page_id=page.id,
-            box_x=bbox["x"],
-            box_y=bbox["y"],
-            box_width=bbox["w"],
-            box_height=bbox["h"],
-            text_original=original,
-            text_translated=translated,
-        )
-        db.add(block)
+    # ── Step D: Save TextBlock records (single bulk INSERT) ───────
+    rows = [
+        {
+            "page_id": page.id,
+            "box_x": bbox["x"],
+            "box_y": bbox["y"],
+            "box_width": bbox["w"],
+            "box_height": bbox["h"],
+            "text_original": original,
+            "text_translated": translated,
+        }
+        for (bbox, original), translated in zip(ocr_results, translated_texts)
+    ]
+    await db.execute(insert(TextBlock), rows)
 
     page.status = "translated"
     await db.commit()
+    _STATUS_CACHE.pop(page.project_id, None)
 
     logger.info(
         f"  ✅ Page {page.page_number} done: "
@@ -218,25 +262,32 @@ async def pipeline_status(
     db: AsyncSession = Depends(get_db),
 ):
     """Check the current status of a project's pipeline processing."""
+    cached = _STATUS_CACHE.get(project_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
     result = await db.execute(
-        select(Project)
-        .where(Project.id == project_id)
-        .options(selectinload(Project.pages))
+        select(Project.status).where(Project.id == project_id)
     )
-    project = result.scalar_one_or_none()
+    project_status = result.scalar_one_or_none()
 
-    if not project:
+    if not project_status:
         raise HTTPException(status_code=404, detail="Project not found.")
 
-    page_statuses = {}
-    for page in project.pages:
-        status = page.status
-        page_statuses[status] = page_statuses.get(status, 0) + 1
+    # Aggregate in SQLite instead of hydrating every Page row
+    counts = await db.execute(
+        select(Page.status, func.count())
+        .where(Page.project_id == project_id)
+        .group_by(Page.status)
+    )
+    page_statuses = dict(counts.all())
 
-    return {
-        "project_id": project.id,
-        "project_status": project.status,
-        "total_pages": len(project.pages),
+    payload = {
+        "project_id": project_id,
+        "project_status": project_status,
+        "total_pages": sum(page_statuses.values()),
         "page_statuses": page_statuses,
     }
+    _STATUS_CACHE[project_id] = (time.monotonic() + _STATUS_CACHE_TTL, payload)
+    return payload
 
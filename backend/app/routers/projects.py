@@ -5,18 +5,36 @@ GET  /   → List all projects
 GET  /{id} → Get project details (with pages & text blocks)
 """
 
+import os.path
+from uuid import uuid4
+
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from loguru import logger
-from sqlalchemy import select, func
+from sqlalchemy import insert, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
 from app.database import get_db
 from app.models.project import Page, Project, TextBlock
-from app.schemas.project import ProjectListItem, ProjectResponse, TextBlockResponse, TextBlockUpdate
+from app.schemas.project import (
+    PageResponse,
+    ProjectListItem,
+    ProjectResponse,
+    TextBlockResponse,
+    TextBlockUpdate,
+)
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+# Hoisted to module scope so the compiled-statement cache key stays stable
+_SELECT_PROJECT_WITH_BLOCKS = select(Project).options(
+    selectinload(Project.pages).selectinload(Page.text_blocks)
+)
+# Thin variant: noload leaves text_blocks empty instead of hydrating them
+_SELECT_PROJECT_WITH_PAGES = select(Project).options(
+    selectinload(Project.pages).noload(Page.text_blocks)
+)
+
 
 # ── POST / — Create Project + Upload ──────────────────────────────────
 @router.post("/", response_model=ProjectResponse, status_code=201)
@@ -52,17 +70,20 @@ async def create_project(
         logger.error(f"Upload processing failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to process uploaded file.")
 
-    # 3. Create Page records for each extracted image
-    for idx, img_path in enumerate(image_paths):
-        filename = img_path.split("/")[-1]  # Get basename from relative path
-        page = Page(
-            project_id=project.id,
-            filename=filename,
-            page_number=idx + 1,
-            image_path=img_path,
-            status="pending",
-        )
-        db.add(page)
+    # 3. Register all pages with a single bulk INSERT — a 200-page ZIP
+    # becomes one prepared statement instead of 200 ORM inserts.
+    page_rows = [
+        {
+            "id": str(uuid4()),
+            "project_id": project.id,
+            "filename": os.path.basename(img_path),  # C-level, separator-safe
+            "page_number": idx + 1,
+            "image_path": img_path,
+            "status": "pending",
+        }
+        for idx, img_path in enumerate(image_paths)
+    ]
+    await db.execute(insert(Page), page_rows)
 
     # Update project status
     project.status = "ready"
@@ -70,17 +91,18 @@ async def create_project(
 
     logger.info(f"Project '{name}': {len(image_paths)} pages registered")
 
-    # 4. Re-query with relationships loaded for the response
-    result = await db.execute(
-        select(Project)
-        .where(Project.id == project.id)
-        .options(
-            selectinload(Project.pages).selectinload(Page.text_blocks)
-        )
+    # 4. Build the response from the already-known rows — the pages were
+    # just created in this session, so there's nothing to re-query.
+    return ProjectResponse(
+        id=project.id,
+        name=project.name,
+        source_language=project.source_language,
+        target_language=project.target_language,
+        status=project.status,
+        created_at=project.created_at,
+        updated_at=project.updated_at,
+        pages=[PageResponse(**row, text_blocks=[]) for row in page_rows],
     )
-    project_full = result.scalar_one()
-
-    return project_full
 
 
 # ── GET / — List All Projects ─────────────────────────────────────────
@@ -88,50 +110,45 @@ async def create_project(
 async def list_projects(db: AsyncSession = Depends(get_db)):
     """Return all projects, newest first, with page counts."""
 
-    # Subquery for page count
-    page_count_subq = (
-        select(
-            Page.project_id,
-            func.count(Page.id).label("page_count"),
-        )
-        .group_by(Page.project_id)
-        .subquery()
-    )
-
+    # Single LEFT JOIN + GROUP BY — no materialized subquery, and the
+    # count rides the pages.project_id index
     result = await db.execute(
-        select(
-            Project,
-            func.coalesce(page_count_subq.c.page_count, 0).label("page_count"),
-        )
-        .outerjoin(page_count_subq, Project.id == page_count_subq.c.project_id)
+        select(Project, func.count(Page.id).label("page_count"))
+        .outerjoin(Page, Page.project_id == Project.id)
+        .group_by(Project.id)
         .order_by(Project.created_at.desc())
     )
 
-    items = []
-    for row in result.all():
-        project = row[0]
-        count = row[1]
-        item = ProjectListItem.model_validate(project)
-        item.page_count = count
-        items.append(item)
-
-    return items
+    # model_construct skips re-validation of values straight from the DB
+    return [
+        ProjectListItem.model_construct(
+            id=project.id,
+            name=project.name,
+            source_language=project.source_language,
+            target_language=project.target_language,
+            status=project.status,
+            created_at=project.created_at,
+            page_count=count,
+        )
+        for project, count in result.all()
+    ]
 
 
 # ── GET /{project_id} — Project Detail ────────────────────────────────
 @router.get("/{project_id}", response_model=ProjectResponse)
-async def get_project(project_id: str, db: AsyncSession = Depends(get_db)):
+async def get_project(
+    project_id: str,
+    include_blocks: bool = True,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Return a single project with all its pages and text blocks.
     Uses selectinload to eagerly load relationships (avoids N+1).
+    Pass `?include_blocks=false` for a thin view (pages only) — skips
+    hydrating thousands of TextBlock rows when only metadata is needed.
     """
-    result = await db.execute(
-        select(Project)
-        .where(Project.id == project_id)
-        .options(
-            selectinload(Project.pages).selectinload(Page.text_blocks)
-        )
-    )
+    stmt = _SELECT_PROJECT_WITH_BLOCKS if include_blocks else _SELECT_PROJECT_WITH_PAGES
+    result = await db.execute(stmt.where(Project.id == project_id))
     project = result.scalar_one_or_none()
 
     if not project:
@@ -156,13 +173,13 @@ async def update_text_block(
     Only the fields sent in the request body will be updated.
     Always marks the block as `is_edited = True`.
     """
-    # Verify block exists and belongs to this project
-    result = await db.execute(
-        select(TextBlock)
-        .join(Page, TextBlock.page_id == Page.id)
-        .where(Page.project_id == project_id, TextBlock.id == block_id)
-    )
-    block = result.scalar_one_or_none()
+    # PK fetch instead of a JOIN — then authorize via the owning page
+    block = await db.get(TextBlock, block_id)
+
+    if block is not None:
+        page = await db.get(Page, block.page_id)
+        if page is None or page.project_id != project_id:
+            block = None
 
     if not block:
         raise HTTPException(
@@ -4,16 +4,20 @@ CRUD for AI provider configuration + GitHub Copilot Device Flow OAuth.
 """
 
 import time
+from functools import lru_cache
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from loguru import logger
 from pydantic import BaseModel
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.database import async_session, get_db
 from app.models.settings import Settings
+from app.services.translation import invalidate_provider_config_cache
 
 router = APIRouter(prefix="/settings", tags=["Settings"])
 
@@ -23,6 +27,32 @@ GITHUB_DEVICE_CODE_URL = "https://github.com/login/device/code"
 GITHUB_TOKEN_URL = "https://github.com/login/oauth/access_token"
 COPILOT_TOKEN_URL = "https://api.github.com/copilot_internal/v2/token"
 
+# Shared client — keeps keep-alive connections to github.com warm across
+# device-flow polls instead of paying a TLS handshake per call
+http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(connect=3.0, read=8.0, write=5.0, pool=2.0),
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+)
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client — called from the app lifespan."""
+    await http_client.aclose()
+
+
+async def _github_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Issue a request with one retry on transient transport errors.
+    Timeouts are not retried — a hung GitHub endpoint must not occupy
+    the worker for another full timeout window.
+    """
+    try:
+        return await http_client.request(method, url, **kwargs)
+    except httpx.TimeoutException:
+        raise
+    except httpx.TransportError:
+        return await http_client.request(method, url, **kwargs)
+
 
 # ═══════════════════════════════════════════════════════════════════════
 #  Schemas
@@ -59,16 +89,87 @@ class PollRequest(BaseModel):
 class PollResponse(BaseModel):
     status: str  # 'pending' | 'authenticated' | 'error'
     message: str | None = None
+    next_interval: float | None = None  # Seconds the client should wait before re-polling
 
 
 # ═══════════════════════════════════════════════════════════════════════
 #  Helpers
 # ═══════════════════════════════════════════════════════════════════════
 
+# Per-device polling state (RFC 8628): device_code -> [interval, expires_at].
+# GitHub's `slow_down` requires increasing the cadence; we double it with a
+# 30 s cap and tell the frontend via `next_interval`.
+_poll_state: dict[str, list[float]] = {}
+_POLL_MAX_INTERVAL = 30.0
+_POLL_SAFETY_MARGIN = 1.2  # Cushion against clock drift on the client
+
+
+def _poll_interval(device_code: str, *, slow_down: bool = False) -> float:
+    """Return (and on slow_down, grow) the polling interval for a device code."""
+    state = _poll_state.get(device_code)
+    if state is None:
+        state = _poll_state[device_code] = [5.0, time.time() + 900]
+    if slow_down:
+        state[0] = min(state[0] * 2, _POLL_MAX_INTERVAL)
+    return state[0] * _POLL_SAFETY_MARGIN
+
+
+_MASK_PREFIX = "•" * 12
+
+
+@lru_cache(maxsize=8)
+def _mask_key(key: str) -> str:
+    """Mask an API key for display — only the last 4 chars are shown."""
+    return _MASK_PREFIX + key[-4:]
+
+
+def _settings_response(settings: Settings) -> SettingsResponse:
+    """Build the API response from a Settings row, masking the key."""
+    # model_validate with from_attributes runs in pydantic-core's Rust
+    # path instead of Python-level kwarg packing
+    response = SettingsResponse.model_validate(settings)
+    response.openrouter_key = (
+        _mask_key(settings.openrouter_key) if settings.openrouter_key else None
+    )
+    response.copilot_authenticated = bool(settings.copilot_access_token)
+    return response
+
+
+async def _write_settings(db: AsyncSession, settings: Settings, values: dict) -> None:
+    """
+    Write settings columns with a single Core UPDATE.
+    synchronize_session=False stops the UPDATE from expiring the
+    instance's other loaded attributes — an expired attribute would
+    lazy-load on next access, which AsyncSession forbids — and the
+    written fields are synced onto the instance by hand instead.
+    """
+    await db.execute(
+        update(Settings)
+        .where(Settings.id == 1)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    for field, value in values.items():
+        set_committed_value(settings, field, value)
+    _invalidate_response_cache()
+    invalidate_provider_config_cache()
+
+
+# In-process cache of the masked GET response — plain pydantic data
+# only. A live ORM instance must never be reused across AsyncSessions:
+# re-attaching one leaves expired attributes whose access triggers a
+# sync lazy-load, which the async session forbids (MissingGreenlet).
+_response_cache: SettingsResponse | None = None
+
+
+def _invalidate_response_cache() -> None:
+    global _response_cache
+    _response_cache = None
+
+
 async def _get_or_create_settings(db: AsyncSession) -> Settings:
     """Get the singleton Settings row, creating it if it doesn't exist."""
-    result = await db.execute(select(Settings).where(Settings.id == 1))
-    settings = result.scalar_one_or_none()
+    settings = await db.get(Settings, 1)
     if not settings:
         settings = Settings(id=1)
         db.add(settings)
@@ -83,20 +184,11 @@ async def _get_or_create_settings(db: AsyncSession) -> Settings:
 @router.get("/", response_model=SettingsResponse)
 async def get_settings(db: AsyncSession = Depends(get_db)):
     """Return the current AI provider configuration."""
-    settings = await _get_or_create_settings(db)
-
-    # Mask the API key for security (only show last 4 chars)
-    masked_key = None
-    if settings.openrouter_key:
-        masked_key = "•" * 12 + settings.openrouter_key[-4:]
-
-    return SettingsResponse(
-        provider=settings.provider,
-        openrouter_key=masked_key,
-        openrouter_model=settings.openrouter_model,
-        copilot_model=settings.copilot_model,
-        copilot_authenticated=bool(settings.copilot_access_token),
-    )
+    global _response_cache
+    if _response_cache is None:
+        settings = await _get_or_create_settings(db)
+        _response_cache = _settings_response(settings)
+    return _response_cache
 
 
 @router.patch("/", response_model=SettingsResponse)
@@ -105,26 +197,16 @@ async def update_settings(
     db: AsyncSession = Depends(get_db),
 ):
     """Update AI provider settings."""
+    global _response_cache
     settings = await _get_or_create_settings(db)
 
     update_data = payload.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(settings, field, value)
-
-    await db.flush()
+    if update_data:
+        await _write_settings(db, settings, update_data)
     logger.info(f"Settings updated: {list(update_data.keys())}")
 
-    masked_key = None
-    if settings.openrouter_key:
-        masked_key = "•" * 12 + settings.openrouter_key[-4:]
-
-    return SettingsResponse(
-        provider=settings.provider,
-        openrouter_key=masked_key,
-        openrouter_model=settings.openrouter_model,
-        copilot_model=settings.copilot_model,
-        copilot_authenticated=bool(settings.copilot_access_token),
-    )
+    _response_cache = _settings_response(settings)
+    return _response_cache
 
 
 # ── GitHub Copilot Device Flow ────────────────────────────────────────
@@ -135,12 +217,19 @@ async def start_copilot_auth():
     Step 1: Request a device code from GitHub.
     Returns user_code + verification_uri for the user to authorize in their browser.
     """
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
+    try:
+        resp = await _github_request(
+            "POST",
             GITHUB_DEVICE_CODE_URL,
             data={"client_id": COPILOT_CLIENT_ID, "scope": "copilot"},
             headers={"Accept": "application/json"},
         )
+    except (httpx.TimeoutException, httpx.TransportError) as e:
+        logger.error(f"GitHub device code request failed: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail="GitHub did not respond in time. Try again.",
+        )
 
     if resp.status_code != 200:
         logger.error(f"GitHub device code request failed: {resp.text}")
@@ -152,6 +241,15 @@ async def start_copilot_auth():
     data = resp.json()
     logger.info(f"Copilot device flow started — user_code: {data.get('user_code')}")
 
+    # Seed polling state and drop entries whose device codes have expired
+    now = time.time()
+    for code in [c for c, st in _poll_state.items() if st[1] < now]:
+        _poll_state.pop(code, None)
+    _poll_state[data["device_code"]] = [
+        float(data.get("interval", 5)),
+        now + data["expires_in"],
+    ]
+
     return DeviceCodeResponse(
         user_code=data["user_code"],
         verification_uri=data["verification_uri"],
@@ -164,6 +262,7 @@ async def start_copilot_auth():
 @router.post("/copilot/poll", response_model=PollResponse)
 async def poll_copilot_auth(
     payload: PollRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -172,8 +271,9 @@ async def poll_copilot_auth(
     then fetches the Copilot inference token and stores both in the DB.
     """
     # Poll GitHub for auth status
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
+    try:
+        resp = await _github_request(
+            "POST",
             GITHUB_TOKEN_URL,
             data={
                 "client_id": COPILOT_CLIENT_ID,
@@ -182,6 +282,8 @@ async def poll_copilot_auth(
             },
             headers={"Accept": "application/json"},
         )
+    except (httpx.TimeoutException, httpx.TransportError):
+        return PollResponse(status="error", message="GitHub request timed out; retry.")
 
     if resp.status_code != 200:
         return PollResponse(status="error", message="GitHub token request failed.")
@@ -192,10 +294,19 @@ async def poll_copilot_auth(
     if "error" in data:
         error = data["error"]
         if error == "authorization_pending":
-            return PollResponse(status="pending", message="Waiting for authorization...")
+            return PollResponse(
+                status="pending",
+                message="Waiting for authorization...",
+                next_interval=_poll_interval(payload.device_code),
+            )
         elif error == "slow_down":
-            return PollResponse(status="pending", message="Slow down, try again later.")
+            return PollResponse(
+                status="pending",
+                message="Slow down, try again later.",
+                next_interval=_poll_interval(payload.device_code, slow_down=True),
+            )
         elif error == "expired_token":
+            _poll_state.pop(payload.device_code, None)
             return PollResponse(status="error", message="Device code expired. Start over.")
         elif error == "access_denied":
             return PollResponse(status="error", message="Access denied by user.")
@@ -207,11 +318,39 @@ async def poll_copilot_auth(
     if not access_token:
         return PollResponse(status="error", message="No access token in response.")
 
-    logger.info("Copilot OAuth: access token received, fetching inference token...")
+    logger.info("Copilot OAuth: access token received")
+
+    # Store the access token now; the inference-token exchange runs after
+    # the response so the terminal poll doesn't pay a second round trip.
+    # Translation already refreshes the inference token on demand if the
+    # background fetch fails.
+    settings = await _get_or_create_settings(db)
+    await _write_settings(
+        db,
+        settings,
+        {"copilot_access_token": access_token, "provider": "copilot"},
+    )
+    # Background tasks run before get_db's commit-at-teardown, so the
+    # exchange's second session would block on this request's uncommitted
+    # write lock and time out — and the failure would roll the access
+    # token back. Commit here, then invalidate again so a concurrent
+    # read can't have re-cached pre-commit state.
+    await db.commit()
+    _invalidate_response_cache()
+    invalidate_provider_config_cache()
+
+    _poll_state.pop(payload.device_code, None)
+    background_tasks.add_task(_fetch_inference_token, access_token)
+
+    logger.info("Copilot authenticated — inference token fetch scheduled")
+    return PollResponse(status="authenticated", message="Copilot connected successfully!")
+
 
-    # Step 3: Exchange access token for Copilot inference token
-    async with httpx.AsyncClient() as client:
-        copilot_resp = await client.get(
+async def _fetch_inference_token(access_token: str) -> None:
+    """Exchange the access token for a Copilot inference token (post-response)."""
+    try:
+        copilot_resp = await _github_request(
+            "GET",
             COPILOT_TOKEN_URL,
             headers={
                 "Authorization": f"token {access_token}",
@@ -221,30 +360,28 @@ async def poll_copilot_auth(
                 "Editor-Plugin-Version": "copilot-chat/0.22.2",
             },
         )
+    except (httpx.TimeoutException, httpx.TransportError) as e:
+        logger.error(f"Copilot token exchange failed: {e}")
+        return
 
     if copilot_resp.status_code != 200:
+        # Access token is already stored — translation retries the exchange
         logger.error(f"Copilot token exchange failed: {copilot_resp.text}")
-        # Store access token anyway — can retry inference token later
-        settings = await _get_or_create_settings(db)
-        settings.copilot_access_token = access_token
-        settings.provider = "copilot"
-        await db.flush()
-        return PollResponse(
-            status="authenticated",
-            message="Authenticated, but inference token fetch failed. Will retry on translation.",
-        )
+        return
 
     copilot_data = copilot_resp.json()
-    inference_token = copilot_data.get("token")
-    expires_at = copilot_data.get("expires_at", 0)
 
-    # Save everything to DB
-    settings = await _get_or_create_settings(db)
-    settings.copilot_access_token = access_token
-    settings.copilot_token = inference_token
-    settings.copilot_token_expires = expires_at
-    settings.provider = "copilot"
-    await db.flush()
+    async with async_session() as session:
+        await session.execute(
+            update(Settings)
+            .where(Settings.id == 1)
+            .values(
+                copilot_token=copilot_data.get("token"),
+                copilot_token_expires=copilot_data.get("expires_at", 0),
+            )
+        )
+        await session.commit()
 
+    _invalidate_response_cache()
+    invalidate_provider_config_cache()
     logger.info("Copilot fully authenticated and token stored!")
-    return PollResponse(status="authenticated", message="Copilot connected successfully!")
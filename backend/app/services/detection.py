@@ -4,12 +4,21 @@ Wraps comic-text-detector with lazy-loaded singleton + asyncio.to_thread.
 """
 
 import asyncio
+import os
+import threading
 from pathlib import Path
 
 import cv2
 import numpy as np
 from loguru import logger
 
+from app.config import settings
+
+# Fallback-detection constants — built once, treated as read-only
+_CLOSE_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
+_MIN_AREA_RATIO = 0.01   # Candidate must cover at least 1% of the image
+_MAX_AREA_RATIO = 0.25   # ...and no more than 25%
+
 
 class TextDetector:
     """
@@ -20,15 +29,27 @@ class TextDetector:
 
     _instance: "TextDetector | None" = None
     _model = None
+    _lock = threading.Lock()
 
     def __new__(cls) -> "TextDetector":
-        """Singleton — only one detector instance exists."""
+        """Singleton — only one detector instance exists (thread-safe)."""
+        # Double-checked locking: concurrent to_thread callers must not
+        # both pass the None check and construct (and load) twice
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
 
     def _load_model(self) -> None:
         """Lazy-load the comic-text-detector model on first use."""
+        if self._model is not None:
+            return
+        with self._lock:
+            self._load_model_locked()
+
+    def _load_model_locked(self) -> None:
+        """Actual model load — caller must hold ``_lock``."""
         if self._model is not None:
             return
 
@@ -36,11 +57,13 @@ class TextDetector:
         try:
             from comic_text_detector import TextDetector as CTDModel
 
+            device = self._resolve_device()
             self._model = CTDModel(
                 model_path="",  # Uses default bundled model
-                device="cpu",   # Switch to "cuda" if GPU available
+                device=device,
             )
-            logger.info("✅ comic-text-detector model loaded")
+            self._apply_precision(device)
+            logger.info(f"✅ comic-text-detector model loaded on {device}")
         except ImportError:
             logger.warning(
                 "comic-text-detector not installed. "
@@ -48,6 +71,78 @@ class TextDetector:
             )
             self._model = "fallback"
 
+    @staticmethod
+    def _resolve_device() -> str:
+        """
+        Pick the inference device.
+        CNN inference on full manga pages dominates pipeline wall-clock;
+        CUDA when present is an order-of-magnitude win. DETECTOR_DEVICE
+        forces a specific device (e.g. "cpu" in Docker/CI).
+        """
+        if settings.DETECTOR_DEVICE != "auto":
+            return settings.DETECTOR_DEVICE
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                return "cuda"
+        except ImportError:
+            pass
+        return "cpu"
+
+    def _apply_precision(self, device: str) -> None:
+        """
+        Reduce inference precision when requested (DETECTOR_PRECISION).
+        int8 dynamic quantization roughly halves CPU inference latency
+        on VNNI-capable x86; fp16 halves VRAM and bandwidth on CUDA.
+        FP32 stays the default for correctness debugging.
+        """
+        precision = settings.DETECTOR_PRECISION
+        if precision == "fp32":
+            return
+
+        try:
+            import torch
+
+            net = getattr(self._model, "net", None) or getattr(self._model, "model", None)
+            if net is None:
+                logger.warning("Detector exposes no torch module; keeping fp32")
+                return
+
+            if precision == "int8" and device == "cpu":
+                quantized = torch.quantization.quantize_dynamic(
+                    net, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                if hasattr(self._model, "net"):
+                    self._model.net = quantized
+                else:
+                    self._model.model = quantized
+                logger.info("Detector quantized to int8 for CPU inference")
+            elif precision == "fp16" and device == "cuda":
+                net.half()
+                logger.info("Detector running in fp16 on CUDA")
+            else:
+                logger.warning(
+                    f"Precision '{precision}' not applicable on {device}; keeping fp32"
+                )
+        except Exception as e:
+            # Precision is an optimization — never let it break detection
+            logger.warning(f"Could not apply {precision} precision: {e}")
+
+    @staticmethod
+    def _read_image(image_path: str, flags: int) -> np.ndarray | None:
+        """
+        Read and decode an image in one pass.
+        A single buffered read + cv2.imdecode replaces imread's internal
+        small-chunk I/O, and keeps the door open for mmap/libvips later.
+        """
+        try:
+            with open(image_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        return cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+
     def _detect_sync(self, image_path: str) -> list[dict]:
         """
         Run text detection synchronously.
@@ -55,78 +150,115 @@ class TextDetector:
         """
         self._load_model()
 
-        img = cv2.imread(image_path)
+        if self._model == "fallback":
+            # Contour detection only needs luminance — decode grayscale
+            # directly (1 channel instead of 3) and skip the cvtColor pass
+            gray = self._read_image(image_path, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                logger.error(f"Could not read image: {image_path}")
+                return []
+            return self._detect_fallback(gray)
+
+        img = self._read_image(image_path, cv2.IMREAD_COLOR)
         if img is None:
             logger.error(f"Could not read image: {image_path}")
             return []
 
-        if self._model == "fallback":
-            return self._detect_fallback(img)
-
         # ── comic-text-detector inference ──────────────────────────
         try:
             result = self._model.detect(img)
 
             bboxes = []
             # result.bboxes is typically a numpy array of shape (N, 4, 2)
-            # representing polygon corners, or (N, 4) for xyxy format
-            if hasattr(result, "bboxes") and result.bboxes is not None:
-                for bbox in result.bboxes:
-                    bbox = np.array(bbox)
-
-                    if bbox.ndim == 2:
-                        # Polygon format (4 corners): convert to xyxy
-                        x_min = int(bbox[:, 0].min())
-                        y_min = int(bbox[:, 1].min())
-                        x_max = int(bbox[:, 0].max())
-                        y_max = int(bbox[:, 1].max())
-                    elif bbox.ndim == 1 and len(bbox) == 4:
-                        # xyxy format
-                        x_min, y_min, x_max, y_max = map(int, bbox)
-                    else:
-                        continue
-
-                    w = x_max - x_min
-                    h = y_max - y_min
-
-                    # Filter out tiny noise boxes
-                    if w > 10 and h > 10:
-                        bboxes.append({"x": x_min, "y": y_min, "w": w, "h": h})
+            # representing polygon corners, or (N, 4) for xyxy format.
+            # Reduce all boxes in one pass instead of per-box Python calls.
+            if hasattr(result, "bboxes") and result.bboxes is not None and len(result.bboxes):
+                arr = np.asarray(result.bboxes)
+
+                if arr.ndim == 3:
+                    # Polygon format (N corners): min/max over the corner axis
+                    x_min = arr[:, :, 0].min(axis=1).astype(np.int32)
+                    y_min = arr[:, :, 1].min(axis=1).astype(np.int32)
+                    x_max = arr[:, :, 0].max(axis=1).astype(np.int32)
+                    y_max = arr[:, :, 1].max(axis=1).astype(np.int32)
+                elif arr.ndim == 2 and arr.shape[1] == 4:
+                    # xyxy format
+                    x_min, y_min, x_max, y_max = arr.astype(np.int32).T
+                else:
+                    x_min = y_min = x_max = y_max = np.empty(0, dtype=np.int32)
+
+                w = x_max - x_min
+                h = y_max - y_min
+
+                # Filter out tiny noise boxes
+                keep = (w > 10) & (h > 10)
+                bboxes = [
+                    {"x": int(x), "y": int(y), "w": int(ww), "h": int(hh)}
+                    for x, y, ww, hh in zip(x_min[keep], y_min[keep], w[keep], h[keep])
+                ]
 
             logger.info(f"Detected {len(bboxes)} text regions in {Path(image_path).name}")
             return bboxes
 
         except Exception as e:
             logger.error(f"Detection failed, falling back to contours: {e}")
-            return self._detect_fallback(img)
+            return self._detect_fallback(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
 
-    def _detect_fallback(self, img: np.ndarray) -> list[dict]:
+    def _detect_fallback(self, gray: np.ndarray) -> list[dict]:
         """
         Fallback detection using Canny edges + morphological closing.
         Targets speech bubble outlines (closed curves on white background).
+        Expects a single-channel grayscale image.
         """
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        img_h, img_w = img.shape[:2]
+        img_h, img_w = gray.shape[:2]
+
+        # ── Step 0: Downscale for the heavy passes ─────────────
+        # Blur/Canny/morphology are O(pixels × kernel) and the output
+        # bboxes only need ~10px accuracy; run them at ≤1200px and map
+        # the boxes back up. Interior checks stay at full resolution.
+        scale = max(1.0, max(img_h, img_w) / 1200.0)
+        if scale > 1.0:
+            small = cv2.resize(
+                gray,
+                (int(img_w / scale), int(img_h / scale)),
+                interpolation=cv2.INTER_AREA,
+            )
+        else:
+            small = gray
 
         # ── Step 1: Edge detection to find bubble borders ──────
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        blurred = cv2.GaussianBlur(small, (5, 5), 0)
         edges = cv2.Canny(blurred, 30, 100)
 
         # Close gaps in bubble outlines so they form closed shapes
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
-        closed = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel, iterations=2)
+        closed = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, _CLOSE_KERNEL, iterations=2)
 
         # ── Step 2: Find contours from closed edges ────────────
         contours, hierarchy = cv2.findContours(
             closed, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE,
         )
 
-        min_area = (img_h * img_w) * 0.01    # At least 1% of image
-        max_area = (img_h * img_w) * 0.25    # No more than 25% of image
+        min_area = (img_h * img_w) * _MIN_AREA_RATIO
+        max_area = (img_h * img_w) * _MAX_AREA_RATIO
+
+        # Summed-area tables: one O(H·W) pass answers every candidate's
+        # mean brightness and white ratio in four loads each, instead of
+        # re-scanning (possibly overlapping) ROIs per contour.
+        # cv2.compare thresholds in a single SIMD pass (0/255 mask) with
+        # no intermediate bool array + astype copy. CV_64F sums: the
+        # int32 default wraps negative above ~33M pixels (tall webtoon
+        # strips), silently rejecting valid bubbles.
+        sat_gray = cv2.integral(gray, sdepth=cv2.CV_64F)
+        sat_white = cv2.integral(cv2.compare(gray, 200, cv2.CMP_GT), sdepth=cv2.CV_64F)
 
         bboxes = []
         for i, cnt in enumerate(contours):
             x, y, w, h = cv2.boundingRect(cnt)
+            # Map the downscaled box back to full-resolution coordinates
+            x = int(x * scale)
+            y = int(y * scale)
+            w = min(int(w * scale), img_w - x)
+            h = min(int(h * scale), img_h - y)
             area = w * h
 
             # Size filter
@@ -141,19 +273,27 @@ class TextDetector:
                 continue
 
             # ── Step 3: White-interior check ──────────────────
-            # Speech bubbles have mostly white/light interiors
-            roi = gray[y:y+h, x:x+w]
-            if roi.size == 0:
+            # Speech bubbles have mostly white/light interiors —
+            # answered from the integral images in O(1) per box
+            roi_size = w * h
+            if roi_size <= 0:
                 continue
 
-            mean_brightness = roi.mean()
+            gray_sum = (
+                sat_gray[y + h, x + w] - sat_gray[y, x + w]
+                - sat_gray[y + h, x] + sat_gray[y, x]
+            )
             # Bubbles are bright inside (white paper), reject dark regions
-            if mean_brightness < 200:
+            if gray_sum / roi_size < 200:
                 continue
 
-            # Check what percentage of the interior is white (>200)
-            white_ratio = (roi > 200).sum() / roi.size
-            if white_ratio < 0.65:
+            # Check what percentage of the interior is white (>200) —
+            # the mask stores 255 per white pixel, hence the 255 factor
+            white_sum = (
+                sat_white[y + h, x + w] - sat_white[y, x + w]
+                - sat_white[y + h, x] + sat_white[y, x]
+            )
+            if white_sum / (255 * roi_size) < 0.65:
                 continue
 
             bboxes.append({"x": x, "y": y, "w": w, "h": h})
@@ -161,46 +301,54 @@ class TextDetector:
         # Remove duplicate/overlapping bboxes
         bboxes = self._remove_overlapping(bboxes)
 
-        # Sort top-to-bottom, right-to-left (manga reading order)
-        bboxes.sort(key=lambda b: (-b["x"], b["y"]))
+        # Sort top-to-bottom, right-to-left (manga reading order) —
+        # lexsort keeps the comparisons in C instead of per-box lambdas
+        if bboxes:
+            x_arr = np.fromiter((b["x"] for b in bboxes), dtype=np.int64, count=len(bboxes))
+            y_arr = np.fromiter((b["y"] for b in bboxes), dtype=np.int64, count=len(bboxes))
+            order = np.lexsort((y_arr, -x_arr))  # Last key is primary
+            bboxes = [bboxes[i] for i in order]
 
         logger.info(f"Fallback detection found {len(bboxes)} bubble regions")
         return bboxes
 
     @staticmethod
     def _remove_overlapping(bboxes: list[dict], iou_threshold: float = 0.5) -> list[dict]:
-        """Remove overlapping bboxes, keeping the larger one."""
+        """Remove overlapping bboxes, keeping the larger one (vectorized NMS)."""
         if not bboxes:
             return []
 
-        # Sort by area (largest first)
-        sorted_boxes = sorted(bboxes, key=lambda b: b["w"] * b["h"], reverse=True)
-        keep = []
+        x = np.array([b["x"] for b in bboxes], dtype=np.float64)
+        y = np.array([b["y"] for b in bboxes], dtype=np.float64)
+        w = np.array([b["w"] for b in bboxes], dtype=np.float64)
+        h = np.array([b["h"] for b in bboxes], dtype=np.float64)
+        xyxy = np.stack([x, y, x + w, y + h], axis=1)
+        areas = w * h
 
-        for box in sorted_boxes:
-            overlapping = False
-            for kept in keep:
-                # Calculate IoU
-                x1 = max(box["x"], kept["x"])
-                y1 = max(box["y"], kept["y"])
-                x2 = min(box["x"] + box["w"], kept["x"] + kept["w"])
-                y2 = min(box["y"] + box["h"], kept["y"] + kept["h"])
+        # Largest-area boxes first; all pairwise IoU work stays in NumPy
+        order = areas.argsort()[::-1]
+        keep = []
 
-                if x1 < x2 and y1 < y2:
-                    intersection = (x2 - x1) * (y2 - y1)
-                    box_area = box["w"] * box["h"]
-                    kept_area = kept["w"] * kept["h"]
-                    union = box_area + kept_area - intersection
-                    iou = intersection / union if union > 0 else 0
+        while order.size > 0:
+            i = order[0]
+            keep.append(int(i))
+            rest = order[1:]
+            if rest.size == 0:
+                break
 
-                    if iou > iou_threshold:
-                        overlapping = True
-                        break
+            inter_w = np.maximum(
+                0.0, np.minimum(xyxy[i, 2], xyxy[rest, 2]) - np.maximum(xyxy[i, 0], xyxy[rest, 0])
+            )
+            inter_h = np.maximum(
+                0.0, np.minimum(xyxy[i, 3], xyxy[rest, 3]) - np.maximum(xyxy[i, 1], xyxy[rest, 1])
+            )
+            inter = inter_w * inter_h
+            union = areas[i] + areas[rest] - inter
+            iou = np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
 
-            if not overlapping:
-                keep.append(box)
+            order = rest[iou <= iou_threshold]
 
-        return keep
+        return [bboxes[i] for i in keep]
 
     async def detect(self, image_path: str) -> list[dict]:
         """
@@ -213,3 +361,24 @@ class TextDetector:
             List of bounding boxes [{"x", "y", "w", "h"}, ...]
         """
         return await asyncio.to_thread(self._detect_sync, image_path)
+
+    async def detect_many(self, image_paths: list[str]) -> list[list[dict]]:
+        """
+        Detect text regions on many pages concurrently.
+
+        Bounded by CPU count so the decode + inference work spreads
+        across all cores without oversubscribing the thread pool.
+
+        Args:
+            image_paths: Absolute paths to the image files.
+
+        Returns:
+            One bbox list per input path, in input order.
+        """
+        semaphore = asyncio.Semaphore(os.cpu_count() or 4)
+
+        async def _bounded(path: str) -> list[dict]:
+            async with semaphore:
+                return await asyncio.to_thread(self._detect_sync, path)
+
+        return list(await asyncio.gather(*(_bounded(p) for p in image_paths)))
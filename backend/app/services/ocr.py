@@ -6,10 +6,70 @@ Falls back to pytesseract or placeholder when AI packages unavailable.
 """
 
 import asyncio
+import contextlib
+from functools import lru_cache
 
+import numpy as np
 from PIL import Image
 from loguru import logger
 
+from app.utils.bbox import bboxes_to_array
+
+# Uniform crop size for batched EasyOCR — readtext_batched needs equal
+# shapes so the crops can be stacked into one tensor
+_BATCH_WIDTH = 800
+_BATCH_HEIGHT = 600
+
+
+@lru_cache(maxsize=4)
+def _decode_image(image_path: str) -> tuple[np.ndarray, int]:
+    """
+    Decode a page to an RGB array, cached per path.
+    A page with N balloons used to be re-decoded N times (once per
+    crop); the small LRU caps memory at a handful of pages while the
+    crops become zero-copy views into one decode.
+
+    Wide JPEG pages decode at half resolution via libjpeg's native
+    1/2 IDCT scaling — OCR downsizes the crops anyway, so the full
+    IDCT work would be thrown away. Returns (array, reduction) where
+    reduction is the factor full-resolution bbox coords must be
+    divided by.
+    """
+    with Image.open(image_path) as probe:
+        # Lazy open: reads the header only, no pixel decode
+        fmt, (width, _) = probe.format, probe.size
+
+    if fmt == "JPEG" and width >= 2 * _BATCH_WIDTH:
+        import cv2
+
+        img = cv2.imread(image_path, cv2.IMREAD_REDUCED_COLOR_2)
+        if img is not None:
+            return cv2.cvtColor(img, cv2.COLOR_BGR2RGB), 2
+
+    return np.asarray(Image.open(image_path).convert("RGB")), 1
+
+
+def _letterbox(crop: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Scale a crop to fit (width, height) and center it on a white canvas.
+    Keeps the aspect ratio — stretching tall narrow balloon crops to a
+    fixed landscape shape distorts the glyphs and hurts recognition.
+    """
+    import cv2
+
+    h, w = crop.shape[:2]
+    scale = min(width / w, height / h)
+    new_w = max(1, round(w * scale))
+    new_h = max(1, round(h * scale))
+    interp = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    resized = cv2.resize(crop, (new_w, new_h), interpolation=interp)
+
+    canvas = np.full((height, width, 3), 255, np.uint8)
+    x0 = (width - new_w) // 2
+    y0 = (height - new_h) // 2
+    canvas[y0:y0 + new_h, x0:x0 + new_w] = resized
+    return canvas
+
 
 class OcrEngine:
     """
@@ -25,6 +85,7 @@ class OcrEngine:
     _easyocr_readers: dict = {}
     _tesseract_available: bool | None = None
     _backend: str | None = None
+    _device: str | None = None
 
     def __new__(cls) -> "OcrEngine":
         if cls._instance is None:
@@ -74,6 +135,44 @@ class OcrEngine:
         )
         return self._backend
 
+    @classmethod
+    def _resolve_device(cls) -> str:
+        """
+        Pick the inference device once: CUDA > MPS > CPU.
+        OCR forward passes are the pipeline's compute bottleneck and
+        both backends run 5-20x faster on an accelerator.
+        """
+        if cls._device is not None:
+            return cls._device
+
+        cls._device = "cpu"
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                cls._device = "cuda"
+            elif torch.backends.mps.is_available():
+                cls._device = "mps"
+        except ImportError:
+            pass
+
+        logger.info(f"OCR inference device: {cls._device}")
+        return cls._device
+
+    @classmethod
+    def _autocast(cls):
+        """
+        FP16 autocast context for CUDA forward passes, no-op elsewhere.
+        Halves memory bandwidth and roughly doubles tensor-core
+        throughput; autocast keeps LayerNorm/BN in FP32 (safer than
+        a blanket .half() on the modules).
+        """
+        if cls._resolve_device() == "cuda":
+            import torch
+
+            return torch.autocast("cuda", dtype=torch.float16)
+        return contextlib.nullcontext()
+
     def _load_manga_ocr(self) -> None:
         """Lazy-load manga-ocr model."""
         if self._manga_ocr is not None:
@@ -81,8 +180,16 @@ class OcrEngine:
 
         logger.info("⏳ Loading manga-ocr model (first run)...")
         from manga_ocr import MangaOcr
-        self._manga_ocr = MangaOcr()
-        logger.info("✅ manga-ocr loaded")
+
+        device = self._resolve_device()
+        # manga-ocr picks CUDA itself; force_cpu pins it when we resolved cpu
+        self._manga_ocr = MangaOcr(force_cpu=(device == "cpu"))
+        if device == "mps":
+            try:
+                self._manga_ocr.model.to("mps")
+            except Exception as e:
+                logger.warning(f"Could not move manga-ocr to MPS, staying on CPU: {e}")
+        logger.info(f"✅ manga-ocr loaded ({device})")
 
     def _load_easyocr(self, lang: str) -> None:
         """Lazy-load EasyOCR reader for a specific language."""
@@ -102,47 +209,139 @@ class OcrEngine:
 
         self._easyocr_readers[lang] = easyocr.Reader(
             ocr_langs,
-            gpu=False,
+            gpu=(self._resolve_device() != "cpu"),
+            cudnn_benchmark=True,
         )
         logger.info(f"✅ EasyOCR loaded for: {ocr_langs}")
 
+    def warmup(self) -> None:
+        """
+        Load the OCR backend and prime it — called at app startup so the
+        first real request doesn't pay model download/parse + lazy
+        submodule initialization.
+        """
+        if self._detect_backend() != "manga_ocr":
+            return
+        try:
+            self._load_manga_ocr()
+            # One tiny inference JIT-initializes tokenizer and decoder
+            with self._autocast():
+                self._manga_ocr(Image.new("RGB", (64, 64), "white"))
+            logger.info("manga-ocr warmed up")
+        except Exception as e:
+            logger.warning(f"OCR warmup failed (will lazy-load instead): {e}")
+
     # ── Crop Helper ───────────────────────────────────────────────
 
     @staticmethod
-    def _crop_bbox(image_path: str, bbox: dict) -> Image.Image:
-        """Crop a bounding box region from an image."""
-        img = Image.open(image_path).convert("RGB")
-        x, y, w, h = bbox["x"], bbox["y"], bbox["w"], bbox["h"]
+    def _crop_bbox(image_path: str, bbox: dict) -> np.ndarray:
+        """Slice a bounding box region from the cached decoded image (a view, no copy)."""
+        img, reduction = _decode_image(image_path)
+        img_h, img_w = img.shape[:2]
 
-        img_w, img_h = img.size
-        x1 = max(0, x)
-        y1 = max(0, y)
-        x2 = min(img_w, x + w)
-        y2 = min(img_h, y + h)
+        x1 = max(0, bbox["x"] // reduction)
+        y1 = max(0, bbox["y"] // reduction)
+        x2 = min(img_w, (bbox["x"] + bbox["w"]) // reduction)
+        y2 = min(img_h, (bbox["y"] + bbox["h"]) // reduction)
 
-        return img.crop((x1, y1, x2, y2))
+        return img[y1:y2, x1:x2]
 
     # ── OCR Runners ───────────────────────────────────────────────
 
     def _ocr_japanese_sync(self, image_path: str, bbox: dict) -> str:
         """Run manga-ocr on a cropped region."""
         self._load_manga_ocr()
-        crop = self._crop_bbox(image_path, bbox)
-        text = self._manga_ocr(crop)
+        # manga-ocr wants a PIL image; fromarray copies only the crop
+        crop = Image.fromarray(self._crop_bbox(image_path, bbox))
+        with self._autocast():
+            text = self._manga_ocr(crop)
         return text.strip()
 
+    def _ocr_japanese_batch_sync(self, image_path: str, bboxes: list[dict]) -> list[str]:
+        """
+        Run manga-ocr over every bbox of a page in one batched forward.
+        Replicates MangaOcr's preprocess (grayscale → RGB) but stacks
+        all crops into a single tensor for the ViT encoder + decoder
+        instead of paying a full generate() per balloon.
+        """
+        self._load_manga_ocr()
+        import torch
+        from manga_ocr.ocr import post_process
+
+        mocr = self._manga_ocr
+        crops = [
+            Image.fromarray(self._crop_bbox(image_path, b)).convert("L").convert("RGB")
+            for b in bboxes
+        ]
+        pixel_values = mocr.feature_extractor(crops, return_tensors="pt").pixel_values
+        device = next(mocr.model.parameters()).device
+
+        with torch.inference_mode(), self._autocast():
+            ids = mocr.model.generate(
+                pixel_values.to(device),
+                max_length=300,
+            )
+
+        texts = mocr.tokenizer.batch_decode(ids, skip_special_tokens=True)
+        # manga-ocr's own post_process (whitespace strip, ellipsis/dot-run
+        # normalization, jaconv half->full-width) so batched output matches
+        # the single-image path exactly
+        return [post_process(t) for t in texts]
+
     def _ocr_easyocr_sync(self, image_path: str, bbox: dict, lang: str) -> str:
         """Run EasyOCR on a cropped region."""
         self._load_easyocr(lang)
-        import numpy as np
         crop = self._crop_bbox(image_path, bbox)
-        crop_np = np.array(crop)
 
         reader = self._easyocr_readers[lang]
-        results = reader.readtext(crop_np, detail=0, paragraph=True)
+        with self._autocast():
+            results = reader.readtext(np.ascontiguousarray(crop), detail=0, paragraph=True)
         text = " ".join(results) if results else ""
         return text.strip()
 
+    def _ocr_easyocr_batch_sync(
+        self,
+        image_path: str,
+        bboxes: list[dict],
+        lang: str,
+    ) -> list[str]:
+        """
+        Run EasyOCR over every bbox of a page in one batched call.
+        The image is decoded once, crops are sliced from the array and
+        letterboxed onto a uniform canvas (aspect ratio preserved), then
+        readtext_batched pushes them through the model in a single
+        forward pass instead of one invocation per balloon.
+        """
+        self._load_easyocr(lang)
+
+        img, reduction = _decode_image(image_path)
+        img_h, img_w = img.shape[:2]
+
+        crops = []
+        empty = []  # Indices whose bbox fell outside the image
+        coords = bboxes_to_array(bboxes, img_w, img_h, reduction=reduction)
+        for i, (x1, y1, x2, y2) in enumerate(coords):
+            if x2 <= x1 or y2 <= y1:
+                empty.append(i)
+                crops.append(np.full((_BATCH_HEIGHT, _BATCH_WIDTH, 3), 255, np.uint8))
+                continue
+            crops.append(_letterbox(img[y1:y2, x1:x2], _BATCH_WIDTH, _BATCH_HEIGHT))
+
+        reader = self._easyocr_readers[lang]
+        with self._autocast():
+            results = reader.readtext_batched(
+                crops,
+                n_width=_BATCH_WIDTH,
+                n_height=_BATCH_HEIGHT,
+                detail=0,
+                paragraph=True,
+            )
+
+        texts = [" ".join(r).strip() if r else "" for r in results]
+        for i in empty:
+            texts[i] = ""
+        return texts
+
     def _ocr_tesseract_sync(self, image_path: str, bbox: dict, lang: str) -> str:
         """Run pytesseract on a cropped region."""
         import pytesseract
@@ -157,6 +356,7 @@ class OcrEngine:
         tess_lang = lang_map.get(lang, "eng")
 
         try:
+            # pytesseract accepts numpy arrays directly
             text = pytesseract.image_to_string(crop, lang=tess_lang)
         except Exception:
             # If language data not available, try eng fallback
@@ -225,3 +425,45 @@ class OcrEngine:
             logger.error(f"OCR failed at ({bbox['x']},{bbox['y']}): {e}")
             # Return placeholder so block still gets created
             return f"[テキスト {bbox['x']},{bbox['y']}]"
+
+    async def extract_text_batch(
+        self,
+        image_path: str,
+        bboxes: list[dict],
+        source_lang: str = "ja",
+    ) -> list[str]:
+        """
+        OCR every bbox of a page, batched where the backend supports it.
+
+        EasyOCR crops go through readtext_batched in one thread hop;
+        other backends fall back to bounded per-region extraction.
+        Returns one text per bbox, in input order.
+        """
+        if not bboxes:
+            return []
+
+        backend = self._detect_backend()
+
+        if backend == "manga_ocr" and source_lang == "ja":
+            try:
+                return await asyncio.to_thread(
+                    self._ocr_japanese_batch_sync, image_path, bboxes,
+                )
+            except Exception as e:
+                logger.error(f"Batched manga-ocr failed, falling back to per-region: {e}")
+
+        if backend == "easyocr":
+            try:
+                return await asyncio.to_thread(
+                    self._ocr_easyocr_batch_sync, image_path, bboxes, source_lang,
+                )
+            except Exception as e:
+                logger.error(f"Batched OCR failed, falling back to per-region: {e}")
+
+        semaphore = asyncio.Semaphore(4)
+
+        async def _one(bbox: dict) -> str:
+            async with semaphore:
+                return await self.extract_text(image_path, bbox, source_lang)
+
+        return list(await asyncio.gather(*(_one(b) for b in bboxes)))
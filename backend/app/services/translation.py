@@ -4,13 +4,22 @@ Dynamic LLM provider: reads config from SQLite (OpenRouter or GitHub Copilot).
 Falls back to .env config if no DB settings exist.
 """
 
+import asyncio
+import hashlib
+import json
+import re
 import time
+import types
+from collections.abc import AsyncIterator
+from functools import lru_cache
+from string import Template
 
 import httpx
 from loguru import logger
 
 from app.config import settings as app_settings
 from app.database import async_session
+from app.models.translation_cache import TranslationCache
 
 
 # ── System Prompt ─────────────────────────────────────────────────────
@@ -31,18 +40,121 @@ Você é um tradutor profissional especializado em mangás, manhwas e webtoons.
 """
 
 
+# ── Shared HTTP client ────────────────────────────────────────────────
+# One pooled client for Copilot calls — keep-alive connections skip the
+# TCP + TLS handshake (~100-300ms) on every completion/token refresh
+_HTTP_CLIENT: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Lazily create the shared pooled HTTP client."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        )
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client — called from the app lifespan."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+# litellm drags in a large dependency tree, so it stays out of app
+# import; the cached reference keeps the hot path to one global check
+_litellm = None
+
+
+def _get_litellm():
+    """Import litellm once and reuse the module reference."""
+    global _litellm
+    if _litellm is None:
+        import litellm
+
+        _litellm = litellm
+    return _litellm
+
+
+def warmup_llm() -> None:
+    """Pay the litellm import at startup instead of the first balloon."""
+    try:
+        litellm = _get_litellm()
+    except ImportError:
+        logger.warning("litellm not installed — OpenRouter/.env providers unavailable")
+        return
+
+    # Route litellm through the shared pooled client so consecutive
+    # completions reuse keep-alive connections instead of opening a
+    # fresh one per call. Credentials stay per-call kwargs — nothing
+    # mutates litellm's globals between requests.
+    litellm.aclient_session = get_http_client()
+
+
+# Provider config rarely changes but is read before every LLM call —
+# a short TTL keeps the hot path off SQLite, and the settings router
+# invalidates eagerly on any update so changes still apply immediately
+_CONFIG_TTL = 60.0
+_CONFIG_CACHE: tuple[float, dict] | None = None
+
+
+def invalidate_provider_config_cache() -> None:
+    """Drop the cached provider config — called when settings change."""
+    global _CONFIG_CACHE
+    _CONFIG_CACHE = None
+
+
 async def _get_provider_config() -> dict:
     """
     Load AI provider configuration from the database.
     Returns dict with keys: provider, api_key, model, api_base
     """
+    global _CONFIG_CACHE
+
+    if _CONFIG_CACHE is not None and time.monotonic() < _CONFIG_CACHE[0]:
+        return _CONFIG_CACHE[1]
+
+    config, deadline = await _load_provider_config()
+    _CONFIG_CACHE = (deadline, config)
+    return config
+
+
+async def _load_provider_config() -> tuple[dict, float]:
+    """Read the provider config from SQLite; returns (config, cache deadline)."""
     from sqlalchemy import select
     from app.models.settings import Settings
 
+    deadline = time.monotonic() + _CONFIG_TTL
+
     async with async_session() as db:
         result = await db.execute(select(Settings).where(Settings.id == 1))
         s = result.scalar_one_or_none()
 
+        if s and s.provider == "copilot":
+            # Check if inference token is expired
+            token = s.copilot_token
+            if not token or (
+                s.copilot_token_expires and s.copilot_token_expires < int(time.time())
+            ):
+                # Refresh on the session we already hold — opening a
+                # second one here doubled the SQLite connection churn
+                token = await _refresh_copilot_token(s.copilot_access_token, db=db)
+            elif s.copilot_token_expires:
+                # Never cache past the inference token's own lifetime
+                remaining = s.copilot_token_expires - time.time() - 30
+                deadline = min(deadline, time.monotonic() + max(0.0, remaining))
+
+            return {
+                "provider": "copilot",
+                "api_key": token,
+                "model": s.copilot_model,
+                "api_base": "https://api.githubcopilot.com",
+            }, deadline
+
     if not s or s.provider == "none":
         # Fallback to .env config
         return {
@@ -50,7 +162,7 @@ async def _get_provider_config() -> dict:
             "api_key": app_settings.LLM_API_KEY,
             "model": app_settings.LLM_MODEL,
             "api_base": None,
-        }
+        }, deadline
 
     if s.provider == "openrouter":
         return {
@@ -58,28 +170,14 @@ async def _get_provider_config() -> dict:
             "api_key": s.openrouter_key,
             "model": f"openrouter/{s.openrouter_model}",
             "api_base": "https://openrouter.ai/api/v1",
-        }
-
-    if s.provider == "copilot":
-        # Check if inference token is expired
-        token = s.copilot_token
-        if not token or (s.copilot_token_expires and s.copilot_token_expires < int(time.time())):
-            # Refresh the inference token
-            token = await _refresh_copilot_token(s.copilot_access_token, db=None)
-
-        return {
-            "provider": "copilot",
-            "api_key": token,
-            "model": s.copilot_model,
-            "api_base": "https://api.githubcopilot.com",
-        }
+        }, deadline
 
     return {
         "provider": "none",
         "api_key": None,
         "model": "gpt-4o",
         "api_base": None,
-    }
+    }, deadline
 
 
 async def _refresh_copilot_token(access_token: str, db=None) -> str | None:
@@ -88,17 +186,16 @@ async def _refresh_copilot_token(access_token: str, db=None) -> str | None:
         return None
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                "https://api.github.com/copilot_internal/v2/token",
-                headers={
-                    "Authorization": f"token {access_token}",
-                    "Accept": "application/json",
-                    "User-Agent": "GitHubCopilotChat/0.22.2",
-                    "Editor-Version": "vscode/1.96.0",
-                    "Editor-Plugin-Version": "copilot-chat/0.22.2",
-                },
-            )
+        resp = await get_http_client().get(
+            "https://api.github.com/copilot_internal/v2/token",
+            headers={
+                "Authorization": f"token {access_token}",
+                "Accept": "application/json",
+                "User-Agent": "GitHubCopilotChat/0.22.2",
+                "Editor-Version": "vscode/1.96.0",
+                "Editor-Plugin-Version": "copilot-chat/0.22.2",
+            },
+        )
 
         if resp.status_code != 200:
             logger.error(f"Copilot token refresh failed: {resp.status_code}")
@@ -108,17 +205,22 @@ async def _refresh_copilot_token(access_token: str, db=None) -> str | None:
         new_token = data.get("token")
         expires_at = data.get("expires_at", 0)
 
-        # Update DB with new token
-        from sqlalchemy import select, update
+        # Update DB with new token — on the caller's session when given
+        from sqlalchemy import update
         from app.models.settings import Settings
 
-        async with async_session() as session:
-            await session.execute(
-                update(Settings)
-                .where(Settings.id == 1)
-                .values(copilot_token=new_token, copilot_token_expires=expires_at)
-            )
-            await session.commit()
+        stmt = (
+            update(Settings)
+            .where(Settings.id == 1)
+            .values(copilot_token=new_token, copilot_token_expires=expires_at)
+        )
+        if db is not None:
+            await db.execute(stmt)
+            await db.commit()
+        else:
+            async with async_session() as session:
+                await session.execute(stmt)
+                await session.commit()
 
         logger.info("Copilot inference token refreshed successfully")
         return new_token
@@ -128,6 +230,42 @@ async def _refresh_copilot_token(access_token: str, db=None) -> str | None:
         return None
 
 
+# Transient provider failures (rate limits, 5xx, timeouts) shouldn't
+# collapse a balloon to "[ERRO]" — retry with exponential backoff first
+_RETRY_ATTEMPTS = 4
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 20.0
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """True for errors worth retrying: rate limits, 5xx, timeouts."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _RETRYABLE_STATUS
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    # litellm exceptions carry the provider status code
+    status = getattr(exc, "status_code", None)
+    return status in _RETRYABLE_STATUS
+
+
+async def _with_retries(call):
+    """Await `call()` with exponential backoff on retryable failures."""
+    delay = _RETRY_BASE_DELAY
+    for attempt in range(1, _RETRY_ATTEMPTS + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt == _RETRY_ATTEMPTS or not _is_retryable(e):
+                raise
+            logger.warning(
+                f"LLM call failed ({e}); retry {attempt}/{_RETRY_ATTEMPTS - 1} "
+                f"in {delay:.0f}s"
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RETRY_MAX_DELAY)
+
+
 async def _call_llm(messages: list[dict], max_tokens: int = 500) -> str:
     """Make an LLM call using the configured provider."""
     config = await _get_provider_config()
@@ -139,22 +277,23 @@ async def _call_llm(messages: list[dict], max_tokens: int = 500) -> str:
 
     # ── Copilot: direct httpx (bypass litellm) ────────────────────
     if provider == "copilot":
-        return await _call_copilot_direct(
+        return await _with_retries(lambda: _call_copilot_direct(
             token=config["api_key"],
             model=config["model"],
             messages=messages,
             max_tokens=max_tokens,
-        )
+        ))
 
     # ── OpenRouter / .env: use litellm ────────────────────────────
     try:
-        import litellm
+        litellm = _get_litellm()
 
         kwargs = {
             "model": config["model"],
             "messages": messages,
             "temperature": 0.3,
             "max_tokens": max_tokens,
+            "timeout": 30,
         }
 
         if config["api_key"]:
@@ -162,7 +301,7 @@ async def _call_llm(messages: list[dict], max_tokens: int = 500) -> str:
         if config["api_base"]:
             kwargs["api_base"] = config["api_base"]
 
-        response = await litellm.acompletion(**kwargs)
+        response = await _with_retries(lambda: litellm.acompletion(**kwargs))
         return response.choices[0].message.content.strip()
 
     except Exception as e:
@@ -170,37 +309,253 @@ async def _call_llm(messages: list[dict], max_tokens: int = 500) -> str:
         raise
 
 
+async def _call_llm_stream(
+    messages: list[dict], max_tokens: int = 500
+) -> AsyncIterator[str]:
+    """Make a streaming LLM call, yielding content deltas as they arrive."""
+    config = await _get_provider_config()
+
+    if not config["api_key"]:
+        raise ValueError("No AI provider configured. Go to Settings to set up OpenRouter or Copilot.")
+
+    provider = config["provider"]
+
+    # ── Copilot: direct httpx SSE stream ──────────────────────────
+    if provider == "copilot":
+        async for delta in _stream_copilot_direct(
+            token=config["api_key"],
+            model=config["model"],
+            messages=messages,
+            max_tokens=max_tokens,
+        ):
+            yield delta
+        return
+
+    # ── OpenRouter / .env: litellm streaming ──────────────────────
+    litellm = _get_litellm()
+
+    kwargs = {
+        "model": config["model"],
+        "messages": messages,
+        "temperature": 0.3,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+    if config["api_key"]:
+        kwargs["api_key"] = config["api_key"]
+    if config["api_base"]:
+        kwargs["api_base"] = config["api_base"]
+
+    try:
+        response = await litellm.acompletion(**kwargs)
+        async for part in response:
+            delta = part.choices[0].delta.content
+            if delta:
+                yield delta
+    except Exception as e:
+        logger.error(f"LLM stream failed (provider={provider}, model={config['model']}): {e}")
+        raise
+
+
+async def _stream_copilot_direct(
+    token: str, model: str, messages: list[dict], max_tokens: int = 500
+) -> AsyncIterator[str]:
+    """Stream from the Copilot API directly via httpx (SSE chunks)."""
+    async with get_http_client().stream(
+        "POST",
+        "https://api.githubcopilot.com/chat/completions",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Copilot-Integration-Id": "vscode-chat",
+            "Editor-Version": "vscode/1.96.0",
+            "Editor-Plugin-Version": "copilot/1.0.0",
+            "Openai-Intent": "conversation-panel",
+        },
+        json={
+            "model": model,
+            "messages": messages,
+            "temperature": 0.3,
+            "max_tokens": max_tokens,
+            "stream": True,
+        },
+    ) as resp:
+        if resp.status_code != 200:
+            body = (await resp.aread())[:500]
+            logger.error(f"Copilot API error {resp.status_code}: {body}")
+            raise RuntimeError(f"Copilot API returned {resp.status_code}: {body}")
+
+        async for line in resp.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            payload = line[6:]
+            if payload == "[DONE]":
+                break
+            choices = json.loads(payload).get("choices")
+            if not choices:
+                continue
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
 async def _call_copilot_direct(
     token: str, model: str, messages: list[dict], max_tokens: int = 500
 ) -> str:
     """Call Copilot API directly via httpx (OAI-compatible endpoint)."""
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            "https://api.githubcopilot.com/chat/completions",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-                "Copilot-Integration-Id": "vscode-chat",
-                "Editor-Version": "vscode/1.96.0",
-                "Editor-Plugin-Version": "copilot/1.0.0",
-                "Openai-Intent": "conversation-panel",
-            },
-            json={
-                "model": model,
-                "messages": messages,
-                "temperature": 0.3,
-                "max_tokens": max_tokens,
-                "stream": False,
-            },
+    resp = await get_http_client().post(
+        "https://api.githubcopilot.com/chat/completions",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Copilot-Integration-Id": "vscode-chat",
+            "Editor-Version": "vscode/1.96.0",
+            "Editor-Plugin-Version": "copilot/1.0.0",
+            "Openai-Intent": "conversation-panel",
+        },
+        json={
+            "model": model,
+            "messages": messages,
+            "temperature": 0.3,
+            "max_tokens": max_tokens,
+            "stream": False,
+        },
+    )
+
+    if resp.status_code != 200:
+        body = resp.text[:500]
+        logger.error(f"Copilot API error {resp.status_code}: {body}")
+        # HTTPStatusError keeps the status visible to the retry logic
+        resp.raise_for_status()
+        raise RuntimeError(f"Copilot API returned {resp.status_code}: {body}")
+
+    data = resp.json()
+    return data["choices"][0]["message"]["content"].strip()
+
+
+# ── Translation cache ─────────────────────────────────────────────────
+# Manga repeats itself: the same SFX and interjections show up on every
+# page. Each hit saves a full LLM round trip.
+
+def _cache_key(model: str, source_lang: str, target_lang: str, text: str) -> bytes:
+    """Stable 128-bit key for one (model, source, target, text) tuple."""
+    return hashlib.blake2b(
+        f"{model}|{source_lang}|{target_lang}|{text}".encode(), digest_size=16,
+    ).digest()
+
+
+async def _cache_get_many(keys: list[bytes]) -> dict[bytes, str]:
+    """Fetch cached translations for all keys in a single SELECT."""
+    from sqlalchemy import select
+
+    async with async_session() as db:
+        result = await db.execute(
+            select(TranslationCache.key, TranslationCache.translation)
+            .where(TranslationCache.key.in_(keys))
         )
+        return dict(result.all())
 
-        if resp.status_code != 200:
-            body = resp.text[:500]
-            logger.error(f"Copilot API error {resp.status_code}: {body}")
-            raise RuntimeError(f"Copilot API returned {resp.status_code}: {body}")
 
-        data = resp.json()
-        return data["choices"][0]["message"]["content"].strip()
+async def _cache_put_many(pairs: dict[bytes, str]) -> None:
+    """Store finished translations; concurrent duplicates are ignored."""
+    if not pairs:
+        return
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+    stmt = sqlite_insert(TranslationCache).on_conflict_do_nothing()
+    rows = [{"key": k, "translation": v} for k, v in pairs.items()]
+    try:
+        async with async_session() as db:
+            await db.execute(stmt, rows)
+            await db.commit()
+    except Exception as e:
+        # The cache is best-effort — never fail a translation over it
+        logger.warning(f"Translation cache write failed: {e}")
+
+
+# Batch translation: sub-batch size balances prompt overhead against
+# output length; the semaphore bounds concurrent LLM calls so providers
+# don't rate-limit us
+_BATCH_CHUNK_SIZE = 8
+_LLM_CONCURRENCY = 4
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~3 chars per token for CJK-heavy text)."""
+    return max(1, len(text) // 3)
+
+
+def _pack_chunks(items: list[tuple[int, str]]) -> list[list[tuple[int, str]]]:
+    """
+    Greedy-pack (index, text) items into sub-batches that stay under the
+    configured prompt token budget and the per-chunk item cap, so long
+    balloons can't push a completion past max_tokens and truncate the
+    numbered list.
+    """
+    budget = app_settings.MAX_BATCH_TOKENS
+    chunks: list[list[tuple[int, str]]] = []
+    current: list[tuple[int, str]] = []
+    used = 0
+    for i, t in items:
+        cost = _estimate_tokens(t)
+        if current and (used + cost > budget or len(current) >= _BATCH_CHUNK_SIZE):
+            chunks.append(current)
+            current, used = [], 0
+        current.append((i, t))
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+# "1. texto" / "1) texto" / "[1] texto" lines in a numbered batch response
+_NUMBERED_LINE = re.compile(
+    r"^[ \t]*(?:(\d+)[.)]|\[(\d+)\])[ \t]*(.*)$", re.MULTILINE,
+)
+
+# Static prompt pieces built once at import — the per-call work reduces
+# to joins and a Template.substitute instead of re-rendering f-strings
+_INDEX_PREFIXES = tuple(f"{i}. " for i in range(1, 257))
+_LANG_NAMES = types.MappingProxyType({
+    "ja": "Japanese", "ko": "Korean",
+    "zh": "Chinese", "en": "English",
+    "pt-br": "Brazilian Portuguese",
+})
+
+
+@lru_cache(maxsize=64)
+def _pair_names(source_lang: str, target_lang: str) -> tuple[str, str]:
+    """Resolve a language pair to the English names used in prompts."""
+    return (
+        _LANG_NAMES.get(source_lang, source_lang),
+        _LANG_NAMES.get(target_lang, target_lang),
+    )
+_BATCH_PROMPT = Template(
+    "Translate these $src manga dialogues to $tgt. "
+    "Return ONLY a numbered list with one translation per input number, "
+    "nothing else:\n\n$body"
+)
+
+
+def _parse_batch_response(content: str, count: int) -> list[str] | None:
+    """
+    Parse a numbered-list LLM response back into `count` translations.
+    One MULTILINE finditer pass locates every numbered line; the text
+    between a match and the next (continuation lines) attaches to it.
+    Returns None if the numbering doesn't cover 1..count (caller
+    falls back).
+    """
+    matches = list(_NUMBERED_LINE.finditer(content))
+    parts: dict[int, list[str]] = {}
+    for m, nxt in zip(matches, matches[1:] + [None]):
+        end = nxt.start() if nxt is not None else len(content)
+        segment = m.group(3) + content[m.end():end]
+        parts.setdefault(int(m.group(1) or m.group(2)), []).extend(
+            line.strip() for line in segment.splitlines() if line.strip()
+        )
+
+    if set(parts) != set(range(1, count + 1)):
+        return None
+    return ["\n".join(parts[i]) for i in range(1, count + 1)]
 
 
 class Translator:
@@ -211,6 +566,9 @@ class Translator:
     def __new__(cls) -> "Translator":
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            # One bound shared by chunk prompts and per-block retries,
+            # so fan-out never exceeds what the provider tolerates
+            cls._instance._sem = asyncio.Semaphore(_LLM_CONCURRENCY)
         return cls._instance
 
     async def translate_text(
@@ -227,28 +585,30 @@ class Translator:
         if text.startswith("[テキスト") or text.startswith("[TEXT"):
             return f"(OCR indisponivel) {text}"
 
+        model = (await _get_provider_config())["model"]
+        key = _cache_key(model, source_lang, target_lang, text)
+        cached = await _cache_get_many([key])
+        if key in cached:
+            return cached[key]
+
         try:
-            lang_names = {
-                "ja": "Japanese", "ko": "Korean",
-                "zh": "Chinese", "en": "English",
-                "pt-br": "Brazilian Portuguese",
-            }
-            src = lang_names.get(source_lang, source_lang)
-            tgt = lang_names.get(target_lang, target_lang)
+            src, tgt = _pair_names(source_lang, target_lang)
 
             user_prompt = (
                 f"Translate this {src} manga dialogue to {tgt}. "
                 f"Return ONLY the translation, nothing else:\n\n{text}"
             )
 
-            translated = await _call_llm([
-                {"role": "system", "content": MANGA_TRANSLATOR_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ])
+            async with self._sem:
+                translated = await _call_llm([
+                    {"role": "system", "content": MANGA_TRANSLATOR_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ])
             logger.debug(
                 f"Translated [{source_lang}->{target_lang}]: "
                 f"'{text[:30]}' -> '{translated[:30]}'"
             )
+            await _cache_put_many({key: translated})
             return translated
         except Exception as e:
             logger.error(f"Translation failed: {e}")
@@ -264,19 +624,229 @@ class Translator:
         if not texts:
             return []
 
-        # Check if all texts are placeholders — skip translation entirely
-        all_placeholder = all(
-            t.startswith("[テキスト") or t.startswith("[TEXT") for t in texts
-        )
-        if all_placeholder:
+        # Split out placeholders/empties — only real text goes to the LLM
+        results: list[str | None] = [None] * len(texts)
+        real: list[tuple[int, str]] = []
+        for i, t in enumerate(texts):
+            if not t or not t.strip():
+                results[i] = ""
+            elif t.startswith("[テキスト") or t.startswith("[TEXT"):
+                results[i] = f"(OCR indisponivel) {t}"
+            else:
+                real.append((i, t))
+
+        if not real:
             logger.info(f"All {len(texts)} blocks are OCR placeholders, skipping translation")
-            return [f"(OCR indisponivel) {t}" for t in texts]
+            return [r if r is not None else "" for r in results]
+
+        # Resolve cache hits with one SELECT; only misses hit the LLM.
+        # The model is part of the key so switching providers never
+        # serves translations from a different model
+        model = (await _get_provider_config())["model"]
+        keys = {i: _cache_key(model, source_lang, target_lang, t) for i, t in real}
+        cached = await _cache_get_many(list(keys.values()))
+        misses: list[tuple[int, str]] = []
+        for i, t in real:
+            hit = cached.get(keys[i])
+            if hit is not None:
+                results[i] = hit
+            else:
+                misses.append((i, t))
+
+        if not misses:
+            logger.info(f"Batch fully served from cache ({len(real)} blocks)")
+            return [r if r is not None else "" for r in results]
+
+        # Repeated balloons (SFX, chants) translate once — duplicates
+        # shorten the numbered prompt and get scattered back afterwards
+        by_text: dict[str, list[int]] = {}
+        for i, t in misses:
+            by_text.setdefault(t, []).append(i)
+        real = [(positions[0], t) for t, positions in by_text.items()]
+
+        # Translate in sub-batches of concurrent numbered-list prompts:
+        # latency is bound by network + time-to-first-token, so K chunks
+        # in flight cut wall time by ~K versus one mega-prompt
+        chunks = _pack_chunks(real)
+
+        async def _bounded(chunk: list[tuple[int, str]]) -> list[str]:
+            async with self._sem:
+                return await self._translate_chunk(
+                    [t for _, t in chunk], source_lang, target_lang,
+                )
+
+        outcomes = await asyncio.gather(
+            *(_bounded(c) for c in chunks), return_exceptions=True,
+        )
+
+        fresh: dict[bytes, str] = {}
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, BaseException):
+                # Chunk prompt failed or came back unparseable — retry
+                # each block individually (fanned out under the shared
+                # semaphore) so one bad response can't poison the page
+                logger.warning(f"Batch chunk failed ({outcome}); retrying per-block")
+                retried = await asyncio.gather(
+                    *(self.translate_text(t, source_lang, target_lang) for _, t in chunk)
+                )
+                for (i, _), translated in zip(chunk, retried):
+                    results[i] = translated
+            else:
+                for (i, _), translated in zip(chunk, outcome):
+                    results[i] = translated
+                    fresh[keys[i]] = translated
+
+        # Fan each unique translation back out to its duplicate slots
+        for t, positions in by_text.items():
+            for j in positions[1:]:
+                results[j] = results[positions[0]]
+        await _cache_put_many(fresh)
+
+        logger.info(f"Batch translated {len(real)} blocks in {len(chunks)} chunks")
+        return [r if r is not None else "" for r in results]
+
+    async def translate_batch_stream(
+        self,
+        texts: list[str],
+        source_lang: str = "ja",
+        target_lang: str = "pt-br",
+    ) -> AsyncIterator[tuple[int, str]]:
+        """
+        Translate multiple text blocks, yielding (index, translation) as
+        each block completes instead of waiting for the whole batch.
+        With streamed responses a numbered line is final as soon as the
+        next number starts, so early blocks surface while later ones are
+        still generating.
+        """
+        if not texts:
+            return
+
+        real: list[tuple[int, str]] = []
+        for i, t in enumerate(texts):
+            if not t or not t.strip():
+                yield i, ""
+            elif t.startswith("[テキスト") or t.startswith("[TEXT"):
+                yield i, f"(OCR indisponivel) {t}"
+            else:
+                real.append((i, t))
+        if not real:
+            return
+
+        model = (await _get_provider_config())["model"]
+        keys = {i: _cache_key(model, source_lang, target_lang, t) for i, t in real}
+        cached = await _cache_get_many(list(keys.values()))
+        misses: list[tuple[int, str]] = []
+        for i, t in real:
+            hit = cached.get(keys[i])
+            if hit is not None:
+                yield i, hit
+            else:
+                misses.append((i, t))
+
+        for chunk in _pack_chunks(misses):
+            fresh: dict[bytes, str] = {}
+            done: set[int] = set()
+            try:
+                async for pos, translated in self._stream_chunk(
+                    [t for _, t in chunk], source_lang, target_lang,
+                ):
+                    if pos in done:
+                        continue
+                    done.add(pos)
+                    i, _ = chunk[pos]
+                    fresh[keys[i]] = translated
+                    yield i, translated
+            except Exception as e:
+                logger.warning(f"Streamed chunk failed ({e}); retrying per-block")
+            await _cache_put_many(fresh)
+
+            # Anything the stream didn't cover falls back per-block
+            pending = [(i, t) for pos, (i, t) in enumerate(chunk) if pos not in done]
+            if pending:
+                retried = await asyncio.gather(
+                    *(self.translate_text(t, source_lang, target_lang) for _, t in pending)
+                )
+                for (i, _), translated in zip(pending, retried):
+                    yield i, translated
+
+    async def _stream_chunk(
+        self,
+        chunk: list[str],
+        source_lang: str,
+        target_lang: str,
+    ) -> AsyncIterator[tuple[int, str]]:
+        """Stream one numbered sub-batch, yielding (position, text) pairs."""
+        src, tgt = _pair_names(source_lang, target_lang)
+
+        numbered = "\n".join(
+            _INDEX_PREFIXES[i] + t for i, t in enumerate(chunk)
+        )
+        user_prompt = _BATCH_PROMPT.substitute(src=src, tgt=tgt, body=numbered)
+
+        buffer = ""
+        current: int | None = None
+        lines: list[str] = []
+
+        stream = _call_llm_stream(
+            [
+                {"role": "system", "content": MANGA_TRANSLATOR_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=150 * len(chunk) + 100,
+        )
+        async for delta in stream:
+            buffer += delta
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                m = _NUMBERED_LINE.match(line)
+                if m:
+                    if current is not None and 1 <= current <= len(chunk):
+                        yield current - 1, "\n".join(lines)
+                    current = int(m.group(1) or m.group(2))
+                    rest = m.group(3).strip()
+                    lines = [rest] if rest else []
+                elif current is not None and line.strip():
+                    lines.append(line.strip())
+
+        # Flush the trailing line and the last open number
+        tail = buffer.strip()
+        m = _NUMBERED_LINE.match(buffer)
+        if m:
+            if current is not None and 1 <= current <= len(chunk):
+                yield current - 1, "\n".join(lines)
+            current = int(m.group(1) or m.group(2))
+            rest = m.group(3).strip()
+            lines = [rest] if rest else []
+        elif current is not None and tail:
+            lines.append(tail)
+        if current is not None and 1 <= current <= len(chunk):
+            yield current - 1, "\n".join(lines)
+
+    async def _translate_chunk(
+        self,
+        chunk: list[str],
+        source_lang: str,
+        target_lang: str,
+    ) -> list[str]:
+        """Translate one sub-batch via a numbered-list prompt."""
+        src, tgt = _pair_names(source_lang, target_lang)
 
-        # For small batches or mixed placeholder/real text, translate individually
-        results = []
-        for t in texts:
-            result = await self.translate_text(t, source_lang, target_lang)
-            results.append(result)
+        numbered = "\n".join(
+            _INDEX_PREFIXES[i] + t for i, t in enumerate(chunk)
+        )
+        user_prompt = _BATCH_PROMPT.substitute(src=src, tgt=tgt, body=numbered)
 
-        logger.info(f"Batch translated {len(results)} blocks")
-        return results
+        content = await _call_llm(
+            [
+                {"role": "system", "content": MANGA_TRANSLATOR_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=150 * len(chunk) + 100,
+        )
+
+        parsed = _parse_batch_response(content, len(chunk))
+        if parsed is None:
+            raise ValueError(
+                f"Batch response numbering didn't match {len(chunk)} inputs"
+            )
+        return parsed
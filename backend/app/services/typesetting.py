@@ -5,45 +5,69 @@ Handles word-wrap, font sizing, and centering within bounding boxes.
 """
 
 import asyncio
+import os
 import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 from PIL import Image, ImageDraw, ImageFont
 from loguru import logger
 
+from app.config import settings
+
 
 # ── Font Resolution ───────────────────────────────────────────────────
 
+# Common system fonts (Windows, Mac, Linux) tried after the requested one
+_FONT_CANDIDATES = (
+    # Windows
+    "C:/Windows/Fonts/arial.ttf",
+    "C:/Windows/Fonts/msgothic.ttc",  # Japanese support
+    "C:/Windows/Fonts/YuGothR.ttc",
+    "C:/Windows/Fonts/segoeui.ttf",
+    # macOS
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/Library/Fonts/Arial.ttf",
+    # Linux
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/noto/NotoSansCJK-Regular.ttc",
+)
+
+
+@lru_cache(maxsize=32)
+def _resolve_font_path(font_family: str) -> str | None:
+    """Probe the candidate list once per family; None means no match."""
+    for path in (font_family, *_FONT_CANDIDATES):
+        try:
+            ImageFont.truetype(path, size=12)
+            return path
+        except OSError:
+            continue
+    return None
+
+
+@lru_cache(maxsize=256)
+def _load_font_cached(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """One FreeType face parse per (path, size) — auto-sizing reuses it."""
+    return ImageFont.truetype(path, size=size)
+
+
 def _find_font(font_family: str, font_size: int) -> ImageFont.FreeTypeFont:
     """
     Try to load a TrueType font, with multiple fallback layers.
     Order: requested font → common system fonts → Pillow default.
+    Resolution and loaded faces are memoized — _auto_font_size calls
+    this dozens of times per block with the same handful of sizes.
     """
-    # Candidates: user-requested + common system fonts (Windows, Mac, Linux)
-    candidates = [
-        font_family,
-        # Windows
-        "C:/Windows/Fonts/arial.ttf",
-        "C:/Windows/Fonts/msgothic.ttc",  # Japanese support
-        "C:/Windows/Fonts/YuGothR.ttc",
-        "C:/Windows/Fonts/segoeui.ttf",
-        # macOS
-        "/System/Library/Fonts/Helvetica.ttc",
-        "/Library/Fonts/Arial.ttf",
-        # Linux
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-        "/usr/share/fonts/noto/NotoSansCJK-Regular.ttc",
-    ]
-
-    for path in candidates:
-        try:
-            return ImageFont.truetype(path, size=font_size)
-        except (OSError, IOError):
-            continue
+    path = _resolve_font_path(font_family)
+    if path is not None:
+        return _load_font_cached(path, font_size)
 
     # Ultimate fallback: Pillow's built-in bitmap font
-    logger.warning(f"No TrueType font found. Using Pillow default bitmap font.")
+    logger.warning("No TrueType font found. Using Pillow default bitmap font.")
     return ImageFont.load_default()
 
 
@@ -55,25 +79,39 @@ def _wrap_text(
 ) -> list[str]:
     """
     Word-wrap text to fit within max_width pixels.
-    Uses binary search on character count for efficiency.
+    Binary-searches the character width — wider wraps produce wider
+    lines, so O(log N) wrap-and-measure probes find the widest fit that
+    the old downward scan reached in up to N steps.
     """
     if not text:
         return []
 
+    # font.getlength skips ImageDraw's per-call dispatch overhead
+    try:
+        measure = font.getlength
+    except AttributeError:  # bitmap fallback font on older Pillow
+        def measure(s):
+            return draw.textlength(s, font=font)
+
     # Estimate chars per line based on average character width
-    avg_char_w = max(1, draw.textlength("あいうえ", font=font) / 4)
+    avg_char_w = max(1, measure("あいうえ") / 4)
     chars_per_line = max(1, int(max_width / avg_char_w))
 
-    # Try progressively shorter wraps until text fits
-    for attempt_width in range(chars_per_line, 0, -1):
-        lines = textwrap.wrap(text, width=attempt_width)
+    best: list[str] | None = None
+    lo, hi = 1, chars_per_line
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        lines = textwrap.wrap(text, width=mid)
         if not lines:
             break
-        # Check if the widest line actually fits
-        widest = max(draw.textlength(line, font=font) for line in lines)
-        if widest <= max_width:
-            return lines
-
+        if max(measure(line) for line in lines) <= max_width:
+            best = lines
+            lo = mid + 1
+        else:
+            hi = mid - 1
+
+    if best:
+        return best
     # If nothing fits, force one-char-per-line (extreme case)
     return textwrap.wrap(text, width=1) or [text]
 
@@ -90,28 +128,140 @@ def _auto_font_size(
     """
     Find the largest font size where the wrapped text fits inside the bbox.
     Returns the font object and the wrapped lines.
+    Binary search over the size range — fit is monotone in font size, so
+    ~6 wrap-and-measure probes replace the old 39-step linear scan.
     """
-    best_font = _find_font(font_family, min_size)
-    best_lines = [text]
+    best: tuple[ImageFont.FreeTypeFont, list[str]] | None = None
+    lo, hi = min_size, max_size
 
-    for size in range(max_size, min_size - 1, -1):
-        font = _find_font(font_family, size)
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        font = _find_font(font_family, mid)
         lines = _wrap_text(text, font, box_width - 8, draw)  # 4px horizontal padding
 
-        if not lines:
-            continue
+        # font size + line spacing, 4px vertical padding
+        line_height = font.size + 4
+        if lines and line_height * len(lines) <= (box_height - 8):
+            best = (font, lines)
+            lo = mid + 1
+        else:
+            hi = mid - 1
+
+    if best is not None:
+        return best
+
+    # Nothing fits even at min_size — render at minimum anyway
+    font = _find_font(font_family, min_size)
+    return font, _wrap_text(text, font, box_width - 8, draw) or [text]
+
+
+# Pillow's image encode holds the GIL, so gathering N render_text calls
+# on threads still serializes the save step. Page jobs carry only
+# picklable primitives, making them a natural fit for worker processes;
+# each worker builds its own font caches on first use.
+_process_pool: ProcessPoolExecutor | None = None
+
+
+def _render_page_entry(image_path: str, text_blocks: list[dict], output_path: str) -> str:
+    return Typesetter()._render_sync(image_path, text_blocks, output_path)
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.TYPESET_WORKERS or (os.cpu_count() or 2),
+        )
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Tear down the typesetting worker pool (app shutdown)."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
 
-        # Calculate total text height
-        line_height = font.size + 4  # font size + line spacing
-        total_height = line_height * len(lines)
 
-        if total_height <= (box_height - 8):  # 4px vertical padding
-            return font, lines
+def _save_typeset(img: Image.Image, output_path: str) -> str:
+    """
+    Save a rendered page with per-format encoder tuning. Honors the
+    TYPESET_FORMAT override (e.g. "webp") by swapping the extension;
+    returns the path actually written.
+    """
+    if settings.TYPESET_FORMAT:
+        suffix = "." + settings.TYPESET_FORMAT.lower().lstrip(".")
+        output_path = str(Path(output_path).with_suffix(suffix))
+
+    ext = Path(output_path).suffix.lower()
+    if ext in (".jpg", ".jpeg"):
+        # 4:4:4 subsampling keeps text edges crisp; progressive +
+        # optimize shave bytes for one extra encode pass
+        img.save(output_path, "JPEG", quality=92, subsampling=0,
+                 progressive=True, optimize=True)
+    elif ext == ".webp":
+        img.save(output_path, "WEBP", quality=90, method=4)
+    elif ext == ".png":
+        img.save(output_path, "PNG", optimize=True, compress_level=6)
+    else:
+        img.save(output_path, quality=95)
+    return output_path
+
 
-        best_font = font
-        best_lines = lines
+@dataclass
+class _BlockPlan:
+    """Precomputed layout for one text block, ready to draw."""
+    bbox: tuple[int, int, int, int]  # (x, y, w, h)
+    font: ImageFont.FreeTypeFont
+    lines: list[str]
+    line_height: int
+    total_height: int
+    color: str
+    alignment: str
 
-    return best_font, best_lines
+
+def _plan_block(block: dict, draw: ImageDraw.ImageDraw) -> _BlockPlan | None:
+    """
+    Do the measurement-heavy part of rendering one block: font pick,
+    auto-sizing and word-wrap. Keeping this separate from drawing lets
+    the render loop below stay a plain pass over finished plans.
+    """
+    text = block.get("text_translated", "")
+    if not text or not text.strip():
+        return None
+
+    # Extract bbox coordinates
+    bx = int(block.get("box_x", 0))
+    by = int(block.get("box_y", 0))
+    bw = int(block.get("box_width", 100))
+    bh = int(block.get("box_height", 50))
+
+    # Typesetting properties
+    font_family = block.get("font_family", "Arial")
+    font_size = block.get("font_size", 18)
+
+    # ── Auto-size if text doesn't fit ─────────────────────────────
+    font = _find_font(font_family, font_size)
+    lines = _wrap_text(text, font, bw - 8, draw)
+
+    line_height = font.size + 4
+    total_height = line_height * len(lines)
+
+    # If text overflows vertically, auto-shrink
+    if total_height > (bh - 8):
+        font, lines = _auto_font_size(text, bw, bh, font_family, draw)
+        line_height = font.size + 4
+        total_height = line_height * len(lines)
+
+    return _BlockPlan(
+        bbox=(bx, by, bw, bh),
+        font=font,
+        lines=lines,
+        line_height=line_height,
+        total_height=total_height,
+        color=block.get("text_color", "#000000"),
+        alignment=block.get("text_alignment", "center"),
+    )
 
 
 class Typesetter:
@@ -134,38 +284,27 @@ class Typesetter:
         output_path: str,
     ) -> str:
         """Synchronous text rendering onto image."""
-        img = Image.open(image_path).convert("RGB")
+        img = Image.open(image_path)
+        # draft() flips libjpeg to its fast RGB decode path (no-op for
+        # other formats), and most cleaned pages are already RGB — the
+        # unconditional convert() duplicated the whole pixel buffer
+        img.draft("RGB", img.size)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.load()  # decode now, not lazily mid-draw
         draw = ImageDraw.Draw(img)
 
-        for block in text_blocks:
-            text = block.get("text_translated", "")
-            if not text or not text.strip():
-                continue
-
-            # Extract bbox coordinates
-            bx = int(block.get("box_x", 0))
-            by = int(block.get("box_y", 0))
-            bw = int(block.get("box_width", 100))
-            bh = int(block.get("box_height", 50))
-
-            # Typesetting properties
-            font_family = block.get("font_family", "Arial")
-            font_size = block.get("font_size", 18)
-            text_color = block.get("text_color", "#000000")
-            alignment = block.get("text_alignment", "center")
-
-            # ── Auto-size if text doesn't fit ─────────────────────
-            font = _find_font(font_family, font_size)
-            lines = _wrap_text(text, font, bw - 8, draw)
+        # ── Plan all blocks, then draw ────────────────────────────
+        # Planning stays serial: Pillow holds the GIL through
+        # getlength/getbbox, so a thread pool here buys nothing and
+        # only adds overhead inside the already-parallel page workers
+        plans = [_plan_block(b, draw) for b in text_blocks]
 
-            line_height = font.size + 4
-            total_height = line_height * len(lines)
-
-            # If text overflows vertically, auto-shrink
-            if total_height > (bh - 8):
-                font, lines = _auto_font_size(text, bw, bh, font_family, draw)
-                line_height = font.size + 4
-                total_height = line_height * len(lines)
+        for plan in plans:
+            if plan is None:
+                continue
+            bx, by, bw, bh = plan.bbox
+            font = plan.font
 
             # ── Draw white background behind text ─────────────────
             # Ensures readability over any inpainted surface
@@ -176,34 +315,34 @@ class Typesetter:
             )
 
             # ── Draw each line centered in the bbox ───────────────
-            y_start = by + max(0, (bh - total_height) // 2)
+            y_start = by + max(0, (bh - plan.total_height) // 2)
 
-            for i, line in enumerate(lines):
+            for i, line in enumerate(plan.lines):
                 line_w = draw.textlength(line, font=font)
 
-                if alignment == "center":
+                if plan.alignment == "center":
                     x_pos = bx + (bw - line_w) / 2
-                elif alignment == "right":
+                elif plan.alignment == "right":
                     x_pos = bx + bw - line_w - 4
                 else:  # left
                     x_pos = bx + 4
 
-                y_pos = y_start + (i * line_height)
+                y_pos = y_start + (i * plan.line_height)
 
                 draw.text(
                     (x_pos, y_pos),
                     line,
-                    fill=text_color,
+                    fill=plan.color,
                     font=font,
                 )
 
             logger.debug(
-                f"Rendered '{text[:20]}...' at ({bx},{by}) "
-                f"font={font.size}px, {len(lines)} lines"
+                f"Rendered '{plan.lines[0][:20]}...' at ({bx},{by}) "
+                f"font={font.size}px, {len(plan.lines)} lines"
             )
 
         # Save final image
-        img.save(output_path, quality=95)
+        output_path = _save_typeset(img, output_path)
         logger.info(f"Typeset image saved: {Path(output_path).name}")
 
         return output_path
@@ -227,6 +366,30 @@ class Typesetter:
         Returns:
             Path to the saved output image.
         """
-        return await asyncio.to_thread(
-            self._render_sync, image_path, text_blocks, output_path,
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_process_pool(), _render_page_entry,
+            image_path, text_blocks, output_path,
         )
+
+    async def render_pages(
+        self,
+        jobs: list[tuple[str, list[dict], str]],
+    ) -> list[str]:
+        """
+        Render a batch of pages across the worker pool.
+
+        Args:
+            jobs: (image_path, text_blocks, output_path) per page.
+
+        Returns:
+            Output paths in job order.
+        """
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(
+            loop.run_in_executor(
+                _get_process_pool(), _render_page_entry,
+                image_path, text_blocks, output_path,
+            )
+            for image_path, text_blocks, output_path in jobs
+        ))
@@ -0,0 +1,38 @@
+"""
+Kage Scan — Bounding Box Helpers
+Vectorized conversion/clamping shared by the OCR and inpainting services.
+"""
+
+import numpy as np
+
+
+def bboxes_to_array(
+    bboxes: list[dict],
+    img_w: int,
+    img_h: int,
+    pad: int = 0,
+    reduction: int = 1,
+) -> np.ndarray:
+    """
+    Convert {"x","y","w","h"} dicts to a clamped (N, 4) int32 array of
+    (x1, y1, x2, y2), padding and clipping every box in two vectorized
+    ops instead of four max/min calls per box.
+
+    Args:
+        img_w / img_h: Image bounds to clamp against.
+        pad: Extra pixels added on every side before clamping.
+        reduction: Divisor applied when the image was decoded at
+            reduced resolution.
+    """
+    if not bboxes:
+        return np.empty((0, 4), dtype=np.int32)
+
+    arr = np.array(
+        [[b["x"], b["y"], b["x"] + b["w"], b["y"] + b["h"]] for b in bboxes],
+        dtype=np.int32,
+    )
+    if reduction != 1:
+        arr //= reduction
+    arr[:, [0, 2]] = np.clip(arr[:, [0, 2]] + [-pad, pad], 0, img_w)
+    arr[:, [1, 3]] = np.clip(arr[:, [1, 3]] + [-pad, pad], 0, img_h)
+    return arr
@@ -2,17 +2,32 @@
 Kage Scan — FastAPI Application Entry Point
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
 
 from app.config import settings
 from app.database import init_db
 from app.routers import export, pipeline, projects, settings as settings_router
+from app.services.detection import TextDetector
+from app.services.inpainting import (
+    Inpainter,
+    shutdown_process_pool as shutdown_inpaint_pool,
+)
+from app.services.ocr import OcrEngine
+from app.services.translation import (
+    close_http_client as close_translation_client,
+    warmup_llm,
+)
+from app.services.typesetting import (
+    shutdown_process_pool as shutdown_typeset_pool,
+)
 
 
 # ── Lifespan (startup / shutdown) ─────────────────────────────────────
@@ -29,9 +44,22 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("✅ Database initialized")
 
+    # Warm the models so the first request doesn't pay the multi-second
+    # import + weight-load cost (lazy paths stay as fallback)
+    await asyncio.gather(
+        asyncio.to_thread(TextDetector()._load_model),
+        asyncio.to_thread(OcrEngine().warmup),
+        asyncio.to_thread(Inpainter()._load_model),
+        asyncio.to_thread(warmup_llm),
+    )
+
     yield
 
     # ── Shutdown ───────────────────────────────────────────────────
+    await settings_router.close_http_client()
+    await close_translation_client()
+    shutdown_inpaint_pool()
+    shutdown_typeset_pool()
     logger.info("👋 Kage Scan shutting down...")
 
 
@@ -41,15 +69,23 @@ app = FastAPI(
     description="Automated manga/manhwa/webtoon translation & editing tool",
     version="0.1.0",
     lifespan=lifespan,
+    # orjson serializes the nested project responses (pages → text blocks)
+    # several times faster than the stdlib path, datetimes included
+    default_response_class=ORJSONResponse,
 )
 
-# ── CORS (allow all for local app) ────────────────────────────────────
+# ── CORS ──────────────────────────────────────────────────────────────
+# Explicit origins: the wildcard + credentials combination is rejected
+# by browsers anyway, and a pinned list lets the middleware answer
+# preflights from its fast path. max_age keeps browsers from
+# re-preflighting every API call for a day.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=settings.CORS_ORIGINS,
+    allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 # ── Routers ───────────────────────────────────────────────────────────
@@ -61,9 +97,26 @@ app.include_router(settings_router.router, prefix="/api")
 # ── Static Files (serve uploaded images) ──────────────────────────────
 # Mount the data directory so frontend can load images via:
 #   http://localhost:8000/data/projects/{project_id}/image.png
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with Cache-Control. Starlette already emits ETag and
+    Last-Modified and answers If-None-Match with 304, so a short
+    max-age plus revalidation turns repeated page loads into 304s
+    instead of full image transfers — while pages re-rendered in place
+    (same filename, new mtime) still show fresh within a minute.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=60, must-revalidate"
+        return response
+
+
 data_path = Path(settings.DATA_DIR)
 data_path.mkdir(parents=True, exist_ok=True)
-app.mount("/data", StaticFiles(directory=str(data_path)), name="data")
+app.mount("/data", CachedStaticFiles(directory=str(data_path)), name="data")
 
 
 # ── Health Check ──────────────────────────────────────────────────────
@@ -0,0 +1,98 @@
+"""
+Regression tests for the Copilot device-flow poll.
+
+Background tasks run before get_db's commit-at-teardown, so the poll
+handler must commit the access-token write itself — otherwise the
+inference-token exchange's second session blocks on the uncommitted
+write lock, times out, and the resulting error rolls the access token
+back while the user is told auth succeeded.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+_TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP}/test.db"
+os.environ["DATA_DIR"] = _TMP
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.database import async_session, init_db
+from app.models.settings import Settings
+from app.routers import settings as settings_router
+
+
+def _make_client(monkeypatch, access_token: str, exchange):
+    """App with the settings router and a stubbed GitHub. `exchange`
+    handles the inference-token call (return a Response or raise)."""
+
+    async def fake_github_request(method: str, url: str, **kwargs) -> httpx.Response:
+        request = httpx.Request(method, url)
+        if url == settings_router.GITHUB_TOKEN_URL:
+            return httpx.Response(200, json={"access_token": access_token}, request=request)
+        if url == settings_router.COPILOT_TOKEN_URL:
+            return exchange(request)
+        raise AssertionError(f"unexpected GitHub call: {method} {url}")
+
+    monkeypatch.setattr(settings_router, "_github_request", fake_github_request)
+    settings_router._invalidate_response_cache()
+
+    asyncio.run(init_db())
+    app = FastAPI()
+    app.include_router(settings_router.router, prefix="/api")
+    return TestClient(app)
+
+
+def _fetch_row() -> Settings:
+    async def fetch():
+        async with async_session() as session:
+            return (await session.execute(select(Settings))).scalar_one()
+
+    return asyncio.run(fetch())
+
+
+def test_poll_commits_token_before_background_exchange(monkeypatch):
+    """A successful exchange writes from its own session — which only
+    works if the handler committed the access token first."""
+    exchange = lambda request: httpx.Response(
+        200, json={"token": "cop_inf", "expires_at": 9999999999}, request=request,
+    )
+    with _make_client(monkeypatch, "gho_first", exchange) as client:
+        start = time.monotonic()
+        resp = client.post("/api/settings/copilot/poll", json={"device_code": "dev1"})
+        elapsed = time.monotonic() - start
+
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "authenticated"
+    # No stall on SQLite's busy timeout waiting for the uncommitted lock
+    assert elapsed < 3.0
+
+    row = _fetch_row()
+    assert row.copilot_access_token == "gho_first"
+    assert row.provider == "copilot"
+    assert row.copilot_token == "cop_inf"
+
+
+def test_poll_token_survives_failing_exchange(monkeypatch):
+    """The access token must persist even when the background exchange
+    dies — translation retries the exchange on demand from it."""
+
+    def exchange(request):
+        raise httpx.TimeoutException("exchange timed out")
+
+    with _make_client(monkeypatch, "gho_second", exchange) as client:
+        resp = client.post("/api/settings/copilot/poll", json={"device_code": "dev2"})
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "authenticated"
+
+        resp = client.get("/api/settings/")
+        assert resp.status_code == 200
+        assert resp.json()["provider"] == "copilot"
+        assert resp.json()["copilot_authenticated"] is True
+
+    assert _fetch_row().copilot_access_token == "gho_second"